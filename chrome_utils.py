@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
 """Chrome CDP utilities for browser automation."""
 
+import atexit
+import http.client
+import json
 import os
+import queue
+import signal
 import socket
 import subprocess
+import threading
 import time
 from pathlib import Path
 
@@ -11,6 +17,37 @@ from pathlib import Path
 CDP_PORT = 9222
 CDP_URL = f"http://127.0.0.1:{CDP_PORT}"
 XVFB_DISPLAY = ":99"
+XVFB_SOCKET = Path(f"/tmp/.X11-unix/X{XVFB_DISPLAY[1:]}")  # appears once Xvfb accepts clients
+XVFB_STARTUP_TIMEOUT = 1  # seconds
+CDP_STARTUP_TIMEOUT = 15  # seconds
+CHROME_DATA_DIR = Path.home() / ".chrome_bot"
+# Only our own Chrome (the one using the bot profile) is ever stopped; matched against /proc/<pid>/cmdline
+CHROME_PROCESS_PATTERN = f"--user-data-dir={CHROME_DATA_DIR}"
+CHROME_STOP_TIMEOUT = 1  # seconds between SIGTERM and SIGKILL
+PAGE_POOL_SIZE = 4  # idle pages kept open for reuse
+# Skip first-run setup, extensions, translate/media-router and background services:
+# faster cold start and less RSS for the bot profile
+CHROME_LEAN_FLAGS = (
+    "--no-first-run",
+    "--no-default-browser-check",
+    "--disable-extensions",
+    "--disable-features=Translate,MediaRouter,OptimizationHints",
+    "--disable-background-networking",
+    "--disable-sync",
+    "--metrics-recording-only",
+    "--disable-dev-shm-usage",
+)
+
+# Playwright driver, CDP connection and idle pages shared by every action in the process
+_playwright = None
+_browser = None
+_page_pool: queue.Queue = queue.Queue(maxsize=PAGE_POOL_SIZE)
+_cache_sessions: dict = {}  # page -> CDP session that keeps its HTTP cache enabled
+_page_viewports: dict = {}  # page -> viewport size it had when acquired
+# Browser WebSocket endpoint from the last successful /json/version probe
+_cdp_ws_url: str | None = None
+# Children started with posix_spawn; nobody else waits for them, so reap_spawned() does
+_spawned_pids: set[int] = set()
 
 
 def wake_screen() -> bool:
@@ -43,11 +80,42 @@ def wake_screen() -> bool:
         return True
 
 
-def is_port_open(port: int) -> bool:
-    """Check if a port is open."""
-    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
-        s.settimeout(1)
-        return s.connect_ex(("127.0.0.1", port)) == 0
+def is_cdp_ready(timeout: float = 1.0) -> bool:
+    """Check if CDP is actually serving requests, not just that the port is open.
+
+    Remembers the browser WebSocket URL from the answer so get_cdp_browser() can
+    connect to it directly instead of having Playwright fetch /json/version again.
+    """
+    global _cdp_ws_url
+    # Plain http.client: no proxy lookup (urllib would honour http_proxy even for 127.0.0.1)
+    conn = http.client.HTTPConnection("127.0.0.1", CDP_PORT, timeout=timeout)
+    try:
+        conn.request("GET", "/json/version")
+        resp = conn.getresponse()
+        body = resp.read()
+        if resp.status != 200:
+            return False
+        try:
+            _cdp_ws_url = json.loads(body).get("webSocketDebuggerUrl")
+        except ValueError:
+            _cdp_ws_url = None
+        return True
+    except (OSError, http.client.HTTPException):
+        return False
+    finally:
+        conn.close()
+
+
+def wait_for_cdp(timeout: float = CDP_STARTUP_TIMEOUT) -> bool:
+    """Poll CDP with exponential backoff until it is ready or the timeout expires."""
+    deadline = time.monotonic() + timeout
+    delay = 0.05
+    while time.monotonic() < deadline:
+        if is_cdp_ready(timeout=0.5):
+            return True
+        time.sleep(delay)
+        delay = min(delay * 1.6, 0.5)
+    return False
 
 
 def has_real_display() -> bool:
@@ -71,7 +139,11 @@ def has_real_display() -> bool:
 def ensure_xvfb() -> bool:
     """Ensure Xvfb is running for headless display."""
     # Check if Xvfb is already running on our display
-    result = subprocess.run(["pgrep", "-f", f"Xvfb {XVFB_DISPLAY}"], capture_output=True)
+    result = subprocess.run(
+        ["pgrep", "-f", f"Xvfb {XVFB_DISPLAY}"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
     if result.returncode == 0:
         os.environ["DISPLAY"] = XVFB_DISPLAY
         return True
@@ -82,17 +154,135 @@ def ensure_xvfb() -> bool:
         stdout=subprocess.DEVNULL,
         stderr=subprocess.DEVNULL,
     )
-    time.sleep(1)
+    # Poll for the display socket instead of a fixed sleep; on timeout let Chrome try anyway
+    deadline = time.monotonic() + XVFB_STARTUP_TIMEOUT
+    while not XVFB_SOCKET.exists() and time.monotonic() < deadline:
+        time.sleep(0.05)
     os.environ["DISPLAY"] = XVFB_DISPLAY
     return True
 
 
-def ensure_chrome_cdp() -> bool:
-    """Ensure Chrome is running with CDP enabled."""
+def find_chrome_pids() -> list[int]:
+    """Find our Chrome processes by scanning /proc.
+
+    CHROME_PROCESS_PATTERN must equal a whole argument, so Chromes using a profile
+    like ~/.chrome_bot2 are not matched (a plain `pkill -f` substring match would).
+    """
+    pattern = CHROME_PROCESS_PATTERN.encode()
+    own_pid = os.getpid()
+    pids = []
+    for entry in Path("/proc").iterdir():
+        if not entry.name.isdigit() or int(entry.name) == own_pid:
+            continue
+        try:
+            cmdline = (entry / "cmdline").read_bytes()
+        except OSError:
+            continue
+        if pattern in cmdline.split(b"\0"):
+            pids.append(int(entry.name))
+    return pids
+
+
+def is_process_alive(pid: int) -> bool:
+    """Check if a process still exists and is not a zombie."""
+    try:
+        stat = Path(f"/proc/{pid}/stat").read_text()
+    except OSError:
+        return False
+    # Format: "pid (comm) state ...", comm may contain spaces/parens
+    return stat.rpartition(")")[2].split()[0] != "Z"
+
+
+def stop_chrome(timeout: float = CHROME_STOP_TIMEOUT) -> None:
+    """Stop Chrome gracefully: SIGTERM first, SIGKILL whatever is left after the timeout.
+
+    A clean shutdown lets Chrome flush its profile, so the next launch doesn't
+    go through the crash-recovery ("restore pages") path.
+    """
+    pids = find_chrome_pids()
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGTERM)
+        except (ProcessLookupError, PermissionError):
+            pass
+
+    deadline = time.monotonic() + timeout
+    while pids and time.monotonic() < deadline:
+        time.sleep(0.05)
+        pids = [pid for pid in pids if is_process_alive(pid)]
+
+    for pid in pids:
+        try:
+            os.kill(pid, signal.SIGKILL)
+        except (ProcessLookupError, PermissionError):
+            pass
+    reap_spawned()
+
+
+def prewarm_dns(hosts: tuple[str, ...]) -> None:
+    """Resolve hosts in background threads so the system resolver cache is warm.
+
+    Chrome resolves through the same system resolver (systemd-resolved/nscd),
+    so doing this while Chrome boots takes the cold lookup off the first goto.
+    """
+    for host in hosts:
+        threading.Thread(target=_resolve_quietly, args=(host,), daemon=True).start()
+
+
+def _resolve_quietly(host: str) -> None:
+    try:
+        socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM)
+    except OSError:
+        pass
+
+
+def reap_spawned() -> None:
+    """Collect exit statuses of spawned children that have finished, so they don't stay zombies."""
+    for pid in list(_spawned_pids):
+        try:
+            done, _ = os.waitpid(pid, os.WNOHANG)
+        except ChildProcessError:
+            done = pid
+        if done:
+            _spawned_pids.discard(pid)
+
+
+def spawn_quietly(args: list[str], env: dict[str, str]) -> None:
+    """Start a background program with stdout/stderr sent to /dev/null, without waiting for it.
+
+    Uses posix_spawnp directly, skipping Popen's Python-side fork setup; falls back to Popen
+    where posix_spawn is not available. The pid is kept for reap_spawned(), which
+    stop_chrome() and ensure_chrome_cdp() call.
+    """
+    if not hasattr(os, "posix_spawnp"):
+        subprocess.Popen(args, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, env=env)
+        return
+    pid = os.posix_spawnp(
+        args[0],
+        args,
+        env,
+        file_actions=[
+            (os.POSIX_SPAWN_OPEN, 1, os.devnull, os.O_WRONLY, 0),
+            (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0),
+        ],
+        # Python ignores SIGPIPE/SIGXFSZ; give the child default handlers like Popen does
+        setsigdef=(signal.SIGPIPE, signal.SIGXFSZ),
+    )
+    _spawned_pids.add(pid)
+
+
+def ensure_chrome_cdp(prewarm_hosts: tuple[str, ...] = ()) -> bool:
+    """Ensure Chrome is running with CDP enabled.
+
+    prewarm_hosts are resolved while a freshly launched Chrome is starting up.
+    """
+    # A Chrome we launched earlier may have crashed or been stopped since
+    reap_spawned()
+
     # Wake screen first to ensure good performance
     wake_screen()
     
-    if is_port_open(CDP_PORT):
+    if is_cdp_ready():
         return True
 
     # Prefer real display, fall back to Xvfb
@@ -108,42 +298,144 @@ def ensure_chrome_cdp() -> bool:
 
     print(f"CDP 端口 {CDP_PORT} 未开启，正在重启 Chrome...")
 
-    # Kill existing Chrome processes (force kill, exclude this script)
-    subprocess.run(["pkill", "-9", "-f", "google-chrome"], capture_output=True)
-    time.sleep(2)
+    # Stop our Chrome if it is running without a working CDP endpoint (it holds the profile lock);
+    # other Chrome instances on the machine are left alone
+    stop_chrome()
 
     # Start Chrome with CDP using dedicated profile
-    chrome_data_dir = Path.home() / ".chrome_bot"
     # Use headless mode if no real display or if CHROME_HEADLESS is set
     headless_mode = os.environ.get("CHROME_HEADLESS", "").lower() in ("1", "true", "yes")
     chrome_args = [
         "google-chrome",
         f"--remote-debugging-port={CDP_PORT}",
-        f"--user-data-dir={chrome_data_dir}",
+        f"--user-data-dir={CHROME_DATA_DIR}",
+        *CHROME_LEAN_FLAGS,
     ]
     if headless_mode or display == XVFB_DISPLAY:
-        chrome_args.append("--headless=new")
+        # No screen to draw on, so GPU process is pure overhead
+        chrome_args += ["--headless=new", "--disable-gpu"]
         print("🔇 使用 Chrome headless 模式")
     
-    subprocess.Popen(
-        chrome_args,
-        stdout=subprocess.DEVNULL,
-        stderr=subprocess.DEVNULL,
-        env={**os.environ, "DISPLAY": display},
-    )
+    spawn_quietly(chrome_args, {**os.environ, "DISPLAY": display})
+    prewarm_dns(prewarm_hosts)
 
-    # Wait for CDP to be ready
-    for _ in range(5):
-        time.sleep(1)
-        if is_port_open(CDP_PORT):
-            print("Chrome CDP 已就绪")
-            time.sleep(2)  # Extra wait for full initialization
-            return True
+    # Wait for CDP to be ready (/json/version answering means it is usable)
+    if wait_for_cdp():
+        print("Chrome CDP 已就绪")
+        return True
 
     print("Chrome 启动超时")
     return False
 
 
+def get_cdp_browser():
+    """Return the shared Playwright browser connected over CDP, reconnecting if needed.
+
+    The first call pays for the driver start and the CDP handshake; later calls
+    reuse the same connection until the process exits.
+    """
+    global _playwright, _browser, _cdp_ws_url
+    if _browser is not None and _browser.is_connected():
+        return _browser
+
+    # Pages of a dropped connection are dead
+    _drain_page_pool()
+    if _playwright is None:
+        from playwright.sync_api import sync_playwright
+        _playwright = sync_playwright().start()
+    if _cdp_ws_url:
+        try:
+            _browser = _playwright.chromium.connect_over_cdp(_cdp_ws_url)
+            return _browser
+        except Exception:
+            # Stale endpoint (Chrome restarted since the probe); let Playwright discover it
+            _cdp_ws_url = None
+    _browser = _playwright.chromium.connect_over_cdp(CDP_URL)
+    return _browser
+
+
+def acquire_page():
+    """Take an idle page from the pool, or open a new one in the default context."""
+    browser = get_cdp_browser()
+    try:
+        page = _page_pool.get_nowait()
+        if page.is_closed():
+            raise queue.Empty
+    except queue.Empty:
+        context = browser.contexts[0] if browser.contexts else browser.new_context()
+        page = context.new_page()
+    # Callers may resize the page (twfeed uses a 4000px-tall viewport); release_page() restores it
+    _page_viewports[page] = page.viewport_size
+    return page
+
+
+def route_keeping_cache(page, handler, pattern: str = "**/*") -> None:
+    """page.route() that keeps Chrome's HTTP cache on.
+
+    Playwright disables the cache for a page as soon as it has a route, so every
+    load would re-download static JS/CSS; turn it back on through a CDP session of
+    our own (kept until the page is released).
+    """
+    page.route(pattern, handler)
+    session = _cache_sessions.get(page)
+    if session is None:
+        session = _cache_sessions[page] = page.context.new_cdp_session(page)
+    session.send("Network.setCacheDisabled", {"cacheDisabled": False})
+
+
+def release_page(page) -> None:
+    """Reset a page (routes, viewport, URL) and return it to the pool (close it if the pool is full)."""
+    session = _cache_sessions.pop(page, None)
+    viewport = _page_viewports.pop(page, None)
+    if page.is_closed():
+        return
+    try:
+        if session is not None:
+            session.detach()
+        if page.viewport_size != viewport:
+            if viewport is None:
+                # Playwright can't drop a viewport override; a new page follows the window size again
+                page.close()
+                return
+            page.set_viewport_size(viewport)
+        page.unroute_all()
+        page.goto("about:blank")
+        _page_pool.put_nowait(page)
+    except queue.Full:
+        page.close()
+    except Exception:
+        # Page is in a bad state; don't reuse it
+        try:
+            page.close()
+        except Exception:
+            pass
+
+
+def _drain_page_pool() -> None:
+    """Close and forget all idle pages."""
+    while True:
+        try:
+            page = _page_pool.get_nowait()
+        except queue.Empty:
+            return
+        try:
+            page.close()
+        except Exception:
+            pass
+
+
+@atexit.register
+def close_cdp_browser() -> None:
+    """Close pooled pages and disconnect from Chrome (Chrome itself keeps running)."""
+    global _playwright, _browser
+    _drain_page_pool()
+    _browser = None
+    # Stopping the driver drops the CDP connection, same as leaving `with sync_playwright()`
+    if _playwright is not None:
+        _playwright.stop()
+        _playwright = None
+
+
 if __name__ == "__main__":
     import sys
     success = ensure_chrome_cdp()
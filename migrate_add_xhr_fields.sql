@@ -23,6 +23,7 @@ ALTER TABLE tweets ADD COLUMN IF NOT EXISTS raw_json JSONB;
 -- 添加索引优化查询
 CREATE INDEX IF NOT EXISTS idx_tweets_data_source ON tweets(data_source);
 CREATE INDEX IF NOT EXISTS idx_tweets_scraped_at ON tweets(scraped_at DESC);
+CREATE INDEX IF NOT EXISTS idx_tweets_source_scraped_at ON tweets(data_source, scraped_at DESC);
 CREATE INDEX IF NOT EXISTS idx_tweets_created_at ON tweets(created_at DESC) WHERE created_at IS NOT NULL;
 
 -- 添加注释
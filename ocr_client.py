@@ -0,0 +1,208 @@
+#!/usr/bin/env python3
+"""
+PaddleOCR 调用封装（twfeed / twitter_search 共用）
+- 常驻 OCR 进程 (ocr_worker.py)，模型只加载一次；不可用时退回单次调用 ocr.py
+- 按截图内容哈希缓存识别结果
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import queue
+import subprocess
+import sys
+import threading
+from pathlib import Path
+
+
+# PaddleOCR 脚本路径
+PADDLE_OCR_DIR = Path.home() / "paddle-ocr"
+OCR_WORKER_SCRIPT = Path(__file__).resolve().parent / "ocr_worker.py"
+# 直接用 paddle-ocr 项目 venv 里的解释器，省掉 uv run 每次解析/校验环境的开销；venv 不存在时仍走 uv run
+PADDLE_VENV_PYTHON = PADDLE_OCR_DIR / ".venv" / "bin" / "python"
+PADDLE_PYTHON = [str(PADDLE_VENV_PYTHON)] if PADDLE_VENV_PYTHON.exists() else ["uv", "run", "python"]
+OCR_TIMEOUT = 60  # 单次识别请求
+# 常驻进程加载模型的时间，不计入单次请求的超时；进程卡住时尽快退回单次调用
+OCR_STARTUP_TIMEOUT = 120
+# 常驻进程报告正在构建 TensorRT 引擎（首次可能要好几分钟）后，改用这个超时等它就绪
+OCR_ENGINE_BUILD_TIMEOUT = 900
+# 常驻进程的 stderr（所选后端、加载失败原因等）
+OCR_WORKER_LOG = Path.home() / ".cache" / "twfeed" / "ocr_worker.log"
+# 跳过模型源联网检查；开启 MKL-DNN（CPU 推理加速）
+PADDLE_ENV = {
+    **os.environ,
+    "PADDLE_PDX_DISABLE_MODEL_SOURCE_CHECK": "True",
+    "FLAGS_use_mkldnn": "1",
+}
+
+# OCR 结果缓存：按截图内容哈希，页面没变时直接返回上次的识别结果
+OCR_CACHE_DIR = Path.home() / ".cache" / "twfeed" / "ocr"
+OCR_CACHE_MAX_ENTRIES = 100
+
+# 常驻 OCR 进程（模型只加载一次），首次识别时启动
+_ocr_worker: subprocess.Popen | None = None
+_ocr_worker_lock = threading.Lock()
+# 后台线程把常驻进程 stdout 的每一行放进队列（None 表示进程已退出），读取时可以带超时
+_ocr_replies: queue.Queue = queue.Queue()
+
+
+def _stop_ocr_worker() -> None:
+    """关闭常驻 OCR 进程"""
+    global _ocr_worker
+    worker, _ocr_worker = _ocr_worker, None
+    if worker is None or worker.poll() is not None:
+        return
+    try:
+        worker.stdin.close()
+        worker.wait(timeout=5)
+    except (OSError, subprocess.TimeoutExpired):
+        worker.kill()
+
+
+def _get_ocr_worker() -> subprocess.Popen:
+    """获取常驻 OCR 进程，不存在或已退出时重新启动，并等它加载完模型"""
+    global _ocr_worker, _ocr_replies
+    if _ocr_worker is None or _ocr_worker.poll() is not None:
+        OCR_WORKER_LOG.parent.mkdir(parents=True, exist_ok=True)
+        with open(OCR_WORKER_LOG, "a") as log:
+            _ocr_worker = subprocess.Popen(
+                [*PADDLE_PYTHON, str(OCR_WORKER_SCRIPT)],
+                cwd=PADDLE_OCR_DIR,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=log,
+                text=True,
+                env=PADDLE_ENV,
+            )
+        _ocr_replies = queue.Queue()
+        threading.Thread(
+            target=_pump_worker_output, args=(_ocr_worker.stdout, _ocr_replies), daemon=True
+        ).start()
+        timeout = OCR_STARTUP_TIMEOUT
+        while True:
+            reply = _read_worker_reply(timeout=timeout)
+            if "ready" in reply:
+                print(f"🔤 OCR 后端: {reply['ready']}", file=sys.stderr)
+                break
+            if "building" not in reply:
+                raise ValueError(f"常驻进程启动应答异常: {reply}（日志: {OCR_WORKER_LOG}）")
+            print(f"⏳ 正在构建 {reply['building']} 推理引擎，首次可能需要几分钟...", file=sys.stderr)
+            timeout = OCR_ENGINE_BUILD_TIMEOUT
+    return _ocr_worker
+
+
+def _pump_worker_output(stdout, replies: queue.Queue) -> None:
+    """逐行转发常驻进程的输出"""
+    for line in stdout:
+        replies.put(line)
+    replies.put(None)
+
+
+atexit.register(_stop_ocr_worker)
+
+
+def _read_worker_reply(timeout: float = OCR_TIMEOUT) -> dict:
+    """读回常驻进程的一行 JSON"""
+    try:
+        line = _ocr_replies.get(timeout=timeout)
+    except queue.Empty:
+        raise TimeoutError(f"{timeout}s 内无响应") from None
+    if line is None:
+        raise OSError("常驻进程已退出")
+    return json.loads(line)
+
+
+def _ocr_via_worker(image_paths: tuple[str, ...]) -> list[str] | None:
+    """把图片路径发给常驻进程，按顺序逐张读回识别出的文本行；识别出错返回 None"""
+    worker = _get_ocr_worker()
+    worker.stdin.write("\t".join(image_paths) + "\n")
+    worker.stdin.flush()
+    texts = []
+    for _ in image_paths:
+        reply = _read_worker_reply()
+        if "error" in reply:
+            print(f"❌ OCR 失败: {reply['error']}", file=sys.stderr)
+            return None
+        texts.append("\n".join(reply["lines"]).strip())
+    return texts
+
+
+def _run_paddle_ocr_once(image_path: str) -> str | None:
+    """单次启动 ocr.py 识别图片（常驻进程不可用时的后备）"""
+    try:
+        result = subprocess.run(
+            [*PADDLE_PYTHON, "ocr.py", image_path],
+            cwd=PADDLE_OCR_DIR,
+            capture_output=True,
+            text=True,
+            timeout=OCR_TIMEOUT,
+            env=PADDLE_ENV,
+        )
+        if result.returncode == 0:
+            return result.stdout.strip()
+        else:
+            print(f"❌ OCR 失败: {result.stderr}", file=sys.stderr)
+            return None
+    except Exception as e:
+        print(f"❌ OCR 错误: {e}", file=sys.stderr)
+        return None
+
+
+def _ocr_images(image_paths: list[str]) -> list[str | None] | None:
+    """识别多张图片，返回与输入一一对应的文字（单张失败为 None），整体失败返回 None"""
+    with _ocr_worker_lock:
+        try:
+            return _ocr_via_worker(tuple(image_paths))
+        except (OSError, ValueError, KeyError, TimeoutError) as e:
+            print(f"⚠️ 常驻 OCR 进程不可用 ({e})，改为单次调用；日志: {OCR_WORKER_LOG}", file=sys.stderr)
+            _stop_ocr_worker()
+            return [_run_paddle_ocr_once(path) for path in image_paths]
+
+
+def image_digest(image_path: str) -> str:
+    """截图内容哈希，作为 OCR 缓存键"""
+    return hashlib.blake2b(Path(image_path).read_bytes(), digest_size=16).hexdigest()
+
+
+def read_ocr_cache(digest: str) -> str | None:
+    """读取缓存的识别结果，命中时刷新 mtime（按 mtime 做 LRU 淘汰）"""
+    entry = OCR_CACHE_DIR / f"{digest}.txt"
+    try:
+        text = entry.read_text()
+        entry.touch()
+    except OSError:
+        return None
+    return text
+
+
+def write_ocr_cache(results: dict[str, str]) -> None:
+    """写入识别结果，超过 OCR_CACHE_MAX_ENTRIES 时删掉最久没用过的"""
+    try:
+        OCR_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        for digest, text in results.items():
+            (OCR_CACHE_DIR / f"{digest}.txt").write_text(text)
+        entries = sorted(OCR_CACHE_DIR.glob("*.txt"), key=lambda entry: entry.stat().st_mtime)
+        for entry in entries[:-OCR_CACHE_MAX_ENTRIES]:
+            entry.unlink(missing_ok=True)
+    except OSError as e:
+        print(f"⚠️ 写入 OCR 缓存失败: {e}", file=sys.stderr)
+
+
+def run_paddle_ocr(*image_paths: str) -> str | None:
+    """调用 PaddleOCR 识别一张或多张图片（默认纯文本输出，按顺序拼接），内容相同的截图直接读缓存"""
+    digests = [image_digest(path) for path in image_paths]
+    texts = {digest: read_ocr_cache(digest) for digest in digests}
+
+    # 只识别缓存未命中的图片（相同内容只识别一次）
+    pending = {digest: path for digest, path in zip(digests, image_paths) if texts[digest] is None}
+    if pending:
+        results = _ocr_images(list(pending.values()))
+        if results is None:
+            return None
+        recognized = {digest: text for digest, text in zip(pending, results) if text is not None}
+        texts.update(recognized)
+        write_ocr_cache(recognized)
+
+    result = "\n".join(texts[digest] for digest in digests if texts[digest])
+    return result or None
@@ -0,0 +1,108 @@
+#!/usr/bin/env python3
+"""
+常驻 PaddleOCR 识别进程
+- 启动时加载一次模型，之后复用
+- 协议：要构建 TensorRT 引擎时先回写 {"building": "<后端名>"}（客户端据此放宽启动超时），
+  模型加载完（含引擎构建和预热）回写一行 {"ready": "<后端名>"}；
+  之后 stdin 每行一个请求（一个或多个以 Tab 分隔的图片路径），
+  stdout 按图片顺序每识别完一张就回写一行 JSON {"lines": ["...", ...]}（每个文本行一项），
+  出错时回写 {"error": "..."} 并结束该请求
+
+需在 ~/paddle-ocr 的环境中运行（由 ocr_client.run_paddle_ocr 启动）
+"""
+
+import json
+import os
+import sys
+
+# PaddleOCR 导入和加载模型时都会往 stdout 打日志，先把它们引到 stderr，保证协议通道干净
+REPLY_OUT = sys.stdout
+sys.stdout = sys.stderr
+
+from paddleocr import PaddleOCR  # noqa: E402
+
+
+# 所有设备通用的选项：关掉用不到的文档方向/矫正模型；
+# 检测阶段把长边缩到 960 再跑（识别阶段仍用原图裁出的文本行，识别率不受影响）
+BASE_OPTIONS = {
+    "use_doc_orientation_classify": False,
+    "use_doc_unwarping": False,
+    "use_textline_orientation": False,
+    "text_det_limit_type": "max",
+    "text_det_limit_side_len": 960,
+}
+
+
+def has_cuda_gpu() -> bool:
+    """Paddle 是否为 CUDA 编译且有可用的 GPU"""
+    try:
+        import paddle
+        return paddle.device.is_compiled_with_cuda() and paddle.device.cuda.device_count() > 0
+    except Exception:
+        return False
+
+
+def warm_up(ocr: PaddleOCR) -> None:
+    """用一张空白图跑一次推理，让 TensorRT 在启动时就建好引擎，而不是拖慢第一张截图"""
+    import numpy as np
+    list(ocr.predict(np.full((64, 256, 3), 255, dtype=np.uint8)))
+
+
+def create_ocr() -> tuple[PaddleOCR, str]:
+    """创建 OCR 实例，按顺序尝试：
+    1. NVIDIA GPU：TensorRT + FP16
+    2. CPU 高性能推理（自动选择 ONNX Runtime / OpenVINO 后端）
+    3. CPU MKL-DNN
+    返回 (实例, 后端名)
+    """
+    cpu_options = {**BASE_OPTIONS, "enable_mkldnn": True, "cpu_threads": os.cpu_count() or 4}
+    candidates = [
+        ("CPU 高性能推理", {**cpu_options, "enable_hpi": True}),
+        ("CPU MKL-DNN", cpu_options),
+    ]
+    if has_cuda_gpu():
+        gpu_options = {**BASE_OPTIONS, "device": "gpu", "use_tensorrt": True, "precision": "fp16"}
+        candidates.insert(0, ("GPU TensorRT FP16", gpu_options))
+
+    for name, options in candidates[:-1]:
+        try:
+            if options.get("use_tensorrt"):
+                send(REPLY_OUT, {"building": name})
+            ocr = PaddleOCR(**options)
+            if options.get("use_tensorrt"):
+                warm_up(ocr)
+            print(f"✅ OCR 后端: {name}", file=sys.stderr)
+            return ocr, name
+        except Exception as e:
+            # 未安装 HPI 插件、TensorRT 不可用等情况
+            print(f"⚠️ {name} 不可用: {e}", file=sys.stderr)
+
+    name, options = candidates[-1]
+    print(f"✅ OCR 后端: {name}", file=sys.stderr)
+    return PaddleOCR(**options), name
+
+
+def send(out, reply: dict) -> None:
+    """回写一行 JSON"""
+    out.write(json.dumps(reply, ensure_ascii=False) + "\n")
+    out.flush()
+
+
+def main():
+    ocr, backend = create_ocr()
+    # 客户端等这一行用的是单独的启动超时，模型加载不占单次识别的超时
+    send(REPLY_OUT, {"ready": backend})
+
+    for line in sys.stdin:
+        image_paths = [path for path in line.rstrip("\n").split("\t") if path]
+        if not image_paths:
+            continue
+        try:
+            # 多张图一次 predict，识别网络按批处理；predict 逐张产出结果，识别完一张就回写一张
+            for res in ocr.predict(image_paths):
+                send(REPLY_OUT, {"lines": list(res["rec_texts"])})
+        except Exception as e:
+            send(REPLY_OUT, {"error": str(e)})
+
+if __name__ == "__main__":
+    main()
@@ -4,16 +4,96 @@
 从 tweets_xhr_test.json 读取一条推文，打开详情页分析
 """
 
+import argparse
 import asyncio
 import json
 import sys
+from pathlib import Path
 from playwright.async_api import async_playwright
 
-async def main():
+
+def find_tweet_data(root):
+    """查找第一个 __typename == 'Tweet' 的对象
+
+    Twitter API 响应结构很复杂，用显式栈做深度优先遍历，
+    顺序与递归版本一致，但没有函数调用和路径拼接开销
+    """
+    stack = [root]
+    while stack:
+        obj = stack.pop()
+        if isinstance(obj, dict):
+            if obj.get('__typename') == 'Tweet':
+                return obj
+            stack.extend(reversed(obj.values()))
+        elif isinstance(obj, list):
+            stack.extend(reversed(obj))
+    return None
+
+
+# 推文对象的已知位置：
+#   TweetResultByRestId: data.tweetResult.result
+#   TweetDetail: data.threaded_conversation_with_injections_v2.instructions[*].entries[*]
+#                .content.itemContent.tweet_results.result
+TWEET_RESULT_PATH = ('data', 'tweetResult', 'result')
+INSTRUCTIONS_PATH = ('data', 'threaded_conversation_with_injections_v2', 'instructions')
+ENTRY_RESULT_PATH = ('content', 'itemContent', 'tweet_results', 'result')
+
+
+def get_path(obj, path):
+    """按 key 路径取值，中途不是 dict 则返回 None"""
+    for key in path:
+        if not isinstance(obj, dict):
+            return None
+        obj = obj.get(key)
+    return obj
+
+
+def extract_tweet_data(detail):
+    """按已知结构直接定位推文对象，结构不符时退回通用查找"""
+    result = get_path(detail, TWEET_RESULT_PATH)
+    if result is not None:
+        # result 本身通常就是 Tweet，TweetWithVisibilityResults 时在下一层
+        tweet_obj = find_tweet_data(result)
+        if tweet_obj:
+            return tweet_obj
+    
+    instructions = get_path(detail, INSTRUCTIONS_PATH)
+    if isinstance(instructions, list):
+        for instruction in instructions:
+            if not isinstance(instruction, dict):
+                continue
+            for entry in instruction.get('entries', ()):
+                result = get_path(entry, ENTRY_RESULT_PATH)
+                tweet_obj = find_tweet_data(entry if result is None else result)
+                if tweet_obj:
+                    return tweet_obj
+    
+    return find_tweet_data(detail)
+
+
+# 只需要详情 API 的 JSON，这些资源直接拦掉
+BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font', 'stylesheet'})
+# Twitter 客户端埋点上报
+BLOCKED_URL_PARTS = ('/jot/', '/client_event')
+
+
+async def block_assets(route):
+    """拦截页面资源，只放行文档、脚本和 XHR"""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(part in request.url for part in BLOCKED_URL_PARTS):
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+# 多个抓取脚本可以同时连接同一个 Chrome CDP 端点
+DEFAULT_CDP_URL = "http://localhost:9222"
+
+
+async def main(cdp_url: str = DEFAULT_CDP_URL):
     # 读取之前抓到的推文数据
     try:
-        with open('tweets_xhr_test.json', 'r', encoding='utf-8') as f:
-            tweets = json.load(f)
+        tweets = json.loads(Path('tweets_xhr_test.json').read_bytes())
     except FileNotFoundError:
         print("❌ 找不到 tweets_xhr_test.json，请先运行 tw_xhr_test.py")
         return
@@ -40,86 +120,57 @@ async def main():
     async with async_playwright() as p:
         # 连接到已有的 Chrome
         try:
-            browser = await p.chromium.connect_over_cdp("http://localhost:9222")
+            browser = await p.chromium.connect_over_cdp(cdp_url)
         except Exception as e:
-            print(f"❌ 无法连接到 Chrome CDP: {e}")
+            print(f"❌ 无法连接到 Chrome CDP ({cdp_url}): {e}")
             return
         
+        # 复用已登录的默认上下文，开独立标签页，避免和其他脚本抢同一个页面
         contexts = browser.contexts
-        if contexts:
-            context = contexts[0]
-            pages = context.pages
-            page = pages[0] if pages else await context.new_page()
-        else:
-            print("❌ 没有可用的浏览器上下文")
-            return
+        context = contexts[0] if contexts else await browser.new_context()
+        page = await context.new_page()
         
-        print(f"\n📄 当前页面: {page.url}")
-        
-        # 设置 XHR 监听
+        await page.route('**/*', block_assets)
         captured_data = {}
         
-        async def handle_response(response):
+        def is_detail_response(response):
+            """推文详情 API 的 JSON 响应"""
             url = response.url
-            # 监听推文详情 API
-            if 'TweetDetail' in url or 'TweetResultByRestId' in url:
-                content_type = response.headers.get('content-type', '')
-                if 'json' in content_type:
-                    print(f"\n🎯 捕获详情 API: ...{url[-80:]}")
-                    try:
-                        body = await response.text()
-                        data = json.loads(body)
-                        captured_data['detail'] = data
-                        print(f"✅ 捕获到详情数据 ({len(body)} 字符)")
-                    except Exception as e:
-                        print(f"  ❌ 解析失败: {e}")
-        
-        page.on('response', handle_response)
+            if 'TweetDetail' not in url and 'TweetResultByRestId' not in url:
+                return False
+            return 'json' in response.headers.get('content-type', '')
         
-        # 打开推文详情页
+        # 打开推文详情页，详情 API 一返回就继续，不等 networkidle
         print(f"\n🚀 打开推文详情页...")
         try:
-            await page.goto(tweet_url, wait_until='networkidle', timeout=15000)
-            print("✅ 页面加载完成")
+            async with page.expect_response(is_detail_response, timeout=15000) as response_info:
+                await page.goto(tweet_url, wait_until='domcontentloaded', timeout=15000)
+            response = await response_info.value
+            print(f"\n🎯 捕获详情 API: ...{response.url[-80:]}")
+            try:
+                # 直接取字节，json.loads 可以解析 bytes，省去一次解码成 str
+                body = await response.body()
+                captured_data['detail'] = json.loads(body)
+                captured_data['body'] = body
+                print(f"✅ 捕获到详情数据 ({len(body)} 字节)")
+            except Exception as e:
+                print(f"  ❌ 解析失败: {e}")
         except Exception as e:
             print(f"⚠️  导航超时或失败: {e}")
-            print("  继续分析...")
-        
-        # 等待一下，确保数据加载
-        await asyncio.sleep(2)
         
         # 分析捕获的数据
         if 'detail' in captured_data:
             print("\n📊 分析详情数据...")
             detail = captured_data['detail']
             
-            # 保存原始数据
-            with open('tweet_detail_raw.json', 'w', encoding='utf-8') as f:
-                json.dump(detail, f, ensure_ascii=False, indent=2)
+            # 保存原始数据：直接写响应原文，不再把整棵树重新序列化一遍
+            # （json.dump 带 indent 时走的是纯 Python 编码器）；写盘放到线程里，不阻塞事件循环
+            await asyncio.to_thread(Path('tweet_detail_raw.json').write_bytes, captured_data['body'])
             print("💾 原始数据已保存到 tweet_detail_raw.json")
             
             # 尝试提取关键信息
             try:
-                # Twitter API 响应结构很复杂，我们需要递归查找
-                def find_tweet_data(obj, path=""):
-                    """递归查找推文数据"""
-                    if isinstance(obj, dict):
-                        # 查找推文对象
-                        if obj.get('__typename') == 'Tweet':
-                            return obj
-                        # 递归查找
-                        for key, value in obj.items():
-                            result = find_tweet_data(value, f"{path}.{key}")
-                            if result:
-                                return result
-                    elif isinstance(obj, list):
-                        for i, item in enumerate(obj):
-                            result = find_tweet_data(item, f"{path}[{i}]")
-                            if result:
-                                return result
-                    return None
-                
-                tweet_obj = find_tweet_data(detail)
+                tweet_obj = extract_tweet_data(detail)
                 
                 if tweet_obj:
                     print("\n✅ 找到推文对象！")
@@ -157,8 +208,11 @@ async def main():
                     print(f"  点赞: {extracted['favorite_count']} | 转发: {extracted['retweet_count']} | 回复: {extracted['reply_count']}")
                     
                     # 保存提取的数据
-                    with open('tweet_detail_extracted.json', 'w', encoding='utf-8') as f:
-                        json.dump(extracted, f, ensure_ascii=False, indent=2)
+                    await asyncio.to_thread(
+                        Path('tweet_detail_extracted.json').write_text,
+                        json.dumps(extracted, ensure_ascii=False, indent=2),
+                        encoding='utf-8',
+                    )
                     print("\n💾 已保存到 tweet_detail_extracted.json")
                     
                 else:
@@ -172,6 +226,19 @@ async def main():
         else:
             print("\n⚠️  未捕获到详情 API 响应")
             print("   可能推文已在当前页面，或需要等待更长时间")
+        
+        await page.close()
 
 if __name__ == '__main__':
-    asyncio.run(main())
+    parser = argparse.ArgumentParser(description="测试提取单条推文的详细信息")
+    parser.add_argument("--cdp-url", default=DEFAULT_CDP_URL, help=f"Chrome CDP 地址 (默认 {DEFAULT_CDP_URL})")
+    args = parser.parse_args()
+    
+    # uvloop 是可选的：装了就用 libuv 事件循环处理密集的 CDP 消息，没装用默认循环
+    # （uvloop.run 是 0.18 才有的，更老的版本也退回默认循环）
+    try:
+        import uvloop
+        run = getattr(uvloop, "run", asyncio.run)
+    except ImportError:
+        run = asyncio.run
+    run(main(args.cdp_url))
@@ -5,13 +5,23 @@
 - 保存到 PostgreSQL 数据库
 """
 
+import atexit
+import io
+import json
 import re
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
 import psycopg2
-from psycopg2.extras import execute_values
+from psycopg2.extras import RealDictCursor, execute_values
+from psycopg2.pool import ThreadedConnectionPool
 
 
 # 数据库连接配置 (Docker PostgreSQL)
@@ -23,8 +33,72 @@ DB_CONFIG = {
     "database": "cloudreve",
 }
 
+# 连接池大小
+DB_POOL_MIN = 1
+DB_POOL_MAX = 8
 
-@dataclass
+# 批量写入参数：execute_values 每条语句的行数；
+# 有 tweet_id 的数据超过阈值时先 COPY 到临时表再 upsert
+INSERT_PAGE_SIZE = 1000
+COPY_THRESHOLD = 500
+
+# tweets 表写入列（顺序与 save_tweets 中的元组一致）
+TWEET_COLUMNS = (
+    "author", "author_name", "content", "tweet_url", "voice_file", "voice_text",
+    "likes", "retweets", "views", "created_at",
+    "tweet_id", "reply_count", "quote_count", "user_followers", "user_friends",
+    "user_description", "data_source", "raw_json",
+)
+
+# XHR JSON 导入时每批写入的推文数
+XHR_IMPORT_BATCH = 5000
+
+# 逐元素解码 JSON 数组用
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+# Twitter API 的 created_at 格式
+TWITTER_TIME_FORMAT = "%a %b %d %H:%M:%S %z %Y"
+# fromisoformat 解析不了时（Python 3.10）依次尝试的 ISO-8601 格式
+ISO_TIME_FALLBACK_FORMATS = ("%Y-%m-%dT%H:%M:%S.%f%z", "%Y-%m-%dT%H:%M:%S%z")
+
+# get_recent_tweets 结果缓存时间（秒），save_tweets 写入后立即失效
+RECENT_CACHE_TTL = 5
+RECENT_CACHE_MAX_ENTRIES = 4  # 不同 (limit, data_source, before) 组合最多缓存几个，按 before 翻页时每页都是新键
+
+# raw_json 序列化：紧凑分隔符 + 保留非 ASCII 字符（中文不转成 \uXXXX，体积更小），
+# 数据来自 json 解析结果不会有循环引用，关掉检查
+_encode_raw_json = json.JSONEncoder(
+    ensure_ascii=False, separators=(",", ":"), check_circular=False
+).encode
+
+# COPY text 格式需要转义的字符
+_COPY_ESCAPES = str.maketrans({"\\": "\\\\", "\t": "\\t", "\n": "\\n", "\r": "\\r"})
+
+# OCR 解析用的正则，模块加载时编译一次
+# 互动数据模式（数字+K/M）和时间模式（如 "3h", "May 15"）
+_STATS_PATTERN = r"[\d,.]+[KMkm]?"
+_TIME_PATTERN = r"\d+[hms]|\d+小时|[A-Z][a-z]{2}\s+\d+|\d{1,2}月\d{1,2}日"
+# 匹配 @用户名 模式
+HANDLE_RE = re.compile(r"@([A-Za-z0-9_]+)")
+# 匹配互动数据行
+STATS_RE = re.compile(rf"^{_STATS_PATTERN}$")
+# 行分类：整行是互动数据 / 时间，或行内含 @handle，一次 search 完成（按 lastgroup 分派）
+# 互动数据和时间都不含 @，与 handle 分支互斥；stats 优先于 time（如 "3m"）
+LINE_RE = re.compile(
+    rf"^(?:(?P<stats>{_STATS_PATTERN})|(?P<time>{_TIME_PATTERN}))$|@(?P<handle>[A-Za-z0-9_]+)"
+)
+
+# 跳过的噪音行
+NOISE_LINES = frozenset(["Following", "For you", "Show more", "..."])
+# 过滤掉的 UI 文案
+UI_NOISE = frozenset([
+    "Reply", "Repost", "Like", "Share", "Bookmark", "Views",
+    "回复", "转推", "喜欢", "分享", "书签", "浏览",
+])
+
+
+@dataclass(slots=True)
 class Tweet:
     """推文数据结构"""
     author: str  # @handle
@@ -52,19 +126,26 @@ class Tweet:
     raw_json: Optional[dict] = None
 
 
+_COUNT_MULTIPLIERS = {"K": 1000, "k": 1000, "M": 1_000_000, "m": 1_000_000}
+_STRIP_COMMAS = str.maketrans("", "", ",")
+
+
 def parse_count(text: str) -> Optional[int]:
     """解析数字（支持 K/M 后缀）"""
     if not text:
         return None
-    text = text.strip().upper().replace(",", "")
+    # 只做一次去空白 + 去逗号，后缀查表，纯整数不经过 float
+    text = text.strip().translate(_STRIP_COMMAS)
+    multiplier = _COUNT_MULTIPLIERS.get(text[-1:])
+    if multiplier:
+        text = text[:-1]
+    else:
+        multiplier = 1
     try:
-        if "K" in text:
-            return int(float(text.replace("K", "")) * 1000)
-        elif "M" in text:
-            return int(float(text.replace("M", "")) * 1_000_000)
-        else:
-            return int(float(text))
-    except (ValueError, TypeError):
+        if text.isdigit():
+            return int(text) * multiplier
+        return int(float(text) * multiplier)
+    except (ValueError, OverflowError):  # OverflowError: "inf"
         return None
 
 
@@ -84,99 +165,112 @@ def parse_ocr_to_tweets(ocr_text: str) -> list[Tweet]:
     # 典型模式: @handle · 时间
     # 或者: 显示名\n@handle
     
-    # 按行分割
-    lines = ocr_text.strip().split("\n")
+    # 按行分割，每行只 strip 一次（后面往回看上一行时直接用）
+    lines = [line.strip() for line in ocr_text.strip().split("\n")]
     
     current_tweet = None
     content_lines = []
     
-    # 匹配 @用户名 模式
-    handle_pattern = re.compile(r"@([A-Za-z0-9_]+)")
-    # 匹配互动数据模式（数字+K/M）
-    stats_pattern = re.compile(r"^[\d,.]+[KMkm]?$")
-    # 匹配时间模式
-    time_pattern = re.compile(r"^\d+[hms]$|^\d+小时$|^[A-Z][a-z]{2}\s+\d+$|^\d{1,2}月\d{1,2}日$")
-    
-    i = 0
-    while i < len(lines):
-        line = lines[i].strip()
-        
+    for i, line in enumerate(lines):
         # 跳过空行和噪音
-        if not line or line in ["Following", "For you", "Show more", "..."]:
-            i += 1
+        if not line or line in NOISE_LINES:
             continue
         
-        # 检测新推文的开始：@handle 模式
-        handle_match = handle_pattern.search(line)
+        line_match = LINE_RE.search(line)
+        kind = line_match.lastgroup if line_match else None
         
-        if handle_match and (
+        # 检测新推文的开始：@handle 模式
+        if kind == "handle" and (
             line.startswith("@") or 
             "·" in line or
-            (i > 0 and not lines[i-1].strip())  # 空行后的 @
+            (i > 0 and not lines[i-1])  # 空行后的 @
         ):
             # 保存上一条推文
+            # content_lines 只收非空且已 strip 的行，拼接结果无需再 strip（只保存有内容的）
             if current_tweet and content_lines:
-                current_tweet.content = "\n".join(content_lines).strip()
-                if current_tweet.content:  # 只保存有内容的
-                    tweets.append(current_tweet)
+                current_tweet.content = "\n".join(content_lines)
+                tweets.append(current_tweet)
             
             # 开始新推文
-            author = handle_match.group(1)
+            author = line_match.group("handle")
             author_name = ""
             
             # 尝试从上一行获取显示名
             if i > 0:
-                prev_line = lines[i-1].strip()
-                if prev_line and not handle_pattern.match(prev_line) and not stats_pattern.match(prev_line):
+                prev_line = lines[i-1]
+                if prev_line and not HANDLE_RE.match(prev_line) and not STATS_RE.match(prev_line):
                     author_name = prev_line
             
             current_tweet = Tweet(
-                author=f"@{author}",
-                author_name=author_name,
+                # 同一作者会反复出现，intern 后共享同一个字符串对象
+                author=sys.intern(f"@{author}"),
+                author_name=sys.intern(author_name),
                 content=""
             )
             content_lines = []
-            i += 1
-            continue
-        
-        # 检测互动数据行
-        if current_tweet and stats_pattern.match(line):
-            # 可能是 likes/retweets/views
-            # 通常按顺序出现，尝试解析
-            count = parse_count(line)
-            if count is not None:
-                if current_tweet.views is None and count > 100:
-                    current_tweet.views = count
-                elif current_tweet.likes is None:
-                    current_tweet.likes = count
-                elif current_tweet.retweets is None:
-                    current_tweet.retweets = count
-            i += 1
             continue
         
-        # 跳过时间戳行
-        if time_pattern.match(line):
-            i += 1
+        if kind == "stats" or kind == "time":
+            # 检测互动数据行
+            if current_tweet and kind == "stats":
+                # 可能是 likes/retweets/views
+                # 通常按顺序出现，尝试解析
+                count = parse_count(line)
+                if count is not None:
+                    if current_tweet.views is None and count > 100:
+                        current_tweet.views = count
+                    elif current_tweet.likes is None:
+                        current_tweet.likes = count
+                    elif current_tweet.retweets is None:
+                        current_tweet.retweets = count
+            # 其余情况是时间戳行（或尚无推文时的数字行），跳过
             continue
         
         # 累积内容
         if current_tweet:
             # 过滤掉一些 UI 噪音
-            if line not in ["Reply", "Repost", "Like", "Share", "Bookmark", "Views", 
-                           "回复", "转推", "喜欢", "分享", "书签", "浏览"]:
+            if line not in UI_NOISE:
                 content_lines.append(line)
-        
-        i += 1
     
     # 保存最后一条推文
     if current_tweet and content_lines:
-        current_tweet.content = "\n".join(content_lines).strip()
-        if current_tweet.content:
-            tweets.append(current_tweet)
+        current_tweet.content = "\n".join(content_lines)
+        tweets.append(current_tweet)
     
     return tweets
 
 
+def parse_tweet_time(value: str) -> Optional[datetime]:
+    """
+    解析推文时间，支持两种格式：
+    - Twitter API 固定格式: "Wed Oct 10 20:19:24 +0000 2018"
+    - ISO-8601: "2018-10-10T20:19:24Z"
+    
+    都用标准库的固定格式解析，比 dateutil 的通用猜测快一个数量级
+    """
+    try:
+        if value[:1].isdigit():
+            return _parse_iso_time(value)
+        return datetime.strptime(value, TWITTER_TIME_FORMAT)
+    except (ValueError, TypeError):
+        return None
+
+
+def _parse_iso_time(value: str) -> datetime:
+    """fromisoformat 优先；Python 3.10 的 fromisoformat 不认 "+0000" 时区和非 3/6 位小数秒，
+    这些交给 strptime（%z 两种时区写法都认，%f 接受 1~6 位）"""
+    try:
+        return datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        pass
+    for fmt in ISO_TIME_FALLBACK_FORMATS:
+        try:
+            return datetime.strptime(value, fmt)
+        except ValueError:
+            continue
+    raise ValueError(f"无法解析时间: {value}")
+
+
 def tweet_from_xhr_json(data: dict) -> Tweet:
     """
     从 XHR 拦截的 JSON 数据构造 Tweet 对象
@@ -189,24 +283,26 @@ def tweet_from_xhr_json(data: dict) -> Tweet:
     Returns:
         Tweet 对象
     """
-    from dateutil import parser as date_parser
-    
     # 兼容两种数据格式
-    user = data.get("user", {})
     tweet_id = data.get("tweet_id") or data.get("id")
-    user_name = user.get("name", "") or data.get("user_name", "")
-    screen_name = user.get("screen_name", "") or data.get("screen_name", "")
-    user_description = user.get("description", "") or data.get("user_description", "")
-    user_followers = user.get("followers_count") or data.get("user_followers")
-    user_friends = user.get("friends_count") or data.get("user_friends")
+    user = data.get("user")
+    if user:
+        # 嵌套格式：优先取 user 里的字段，缺失时回退到扁平字段
+        user_name = user.get("name") or data.get("user_name", "")
+        screen_name = user.get("screen_name") or data.get("screen_name", "")
+        user_description = user.get("description") or data.get("user_description", "")
+        user_followers = user.get("followers_count") or data.get("user_followers")
+        user_friends = user.get("friends_count") or data.get("user_friends")
+    else:
+        # 扁平格式（tw_xhr_test.py 的输出）：每个字段只查一次
+        user_name = data.get("user_name", "")
+        screen_name = data.get("screen_name", "")
+        user_description = data.get("user_description", "")
+        user_followers = data.get("user_followers")
+        user_friends = data.get("user_friends")
     
     # 解析时间
-    created_at = None
-    if data.get("created_at"):
-        try:
-            created_at = date_parser.parse(data["created_at"])
-        except:
-            pass
+    created_at = parse_tweet_time(data["created_at"]) if data.get("created_at") else None
     
     # 构造推文 URL
     tweet_url = None
@@ -215,8 +311,8 @@ def tweet_from_xhr_json(data: dict) -> Tweet:
     
     return Tweet(
         tweet_id=tweet_id,
-        author=f"@{screen_name}" if screen_name else "",
-        author_name=user_name,
+        author=sys.intern(f"@{screen_name}") if screen_name else "",
+        author_name=sys.intern(user_name) if user_name else "",
         content=data.get("text", ""),
         tweet_url=tweet_url,
         likes=data.get("favorite_count"),
@@ -232,9 +328,69 @@ def tweet_from_xhr_json(data: dict) -> Tweet:
     )
 
 
-def get_db_connection():
-    """获取数据库连接"""
-    return psycopg2.connect(**DB_CONFIG)
+_db_pool: Optional[ThreadedConnectionPool] = None
+
+
+def get_db_pool() -> ThreadedConnectionPool:
+    """获取数据库连接池（首次使用时创建，进程退出时关闭）"""
+    global _db_pool
+    if _db_pool is None:
+        _db_pool = ThreadedConnectionPool(DB_POOL_MIN, DB_POOL_MAX, **DB_CONFIG)
+        atexit.register(_db_pool.closeall)
+    return _db_pool
+
+
+@contextmanager
+def db_connection():
+    """
+    从连接池借出一个连接，用完归还
+    
+    未提交的事务在归还时由连接池回滚，断开的连接会被丢弃
+    """
+    pool = get_db_pool()
+    conn = pool.getconn()
+    try:
+        yield conn
+    finally:
+        pool.putconn(conn)
+
+
+def _copy_value(value) -> str:
+    """转成 COPY text 格式的字段值"""
+    if value is None:
+        return "\\N"
+    return str(value).translate(_COPY_ESCAPES)
+
+
+class _CopyReader(io.TextIOBase):
+    """
+    COPY FROM STDIN 的只读输入：copy_expert 每次 read(size) 时才生成对应的行
+    
+    不像 StringIO 那样先把整批数据拼成一个大字符串，内存占用与批量大小无关
+    """
+    
+    def __init__(self, rows: list[tuple]):
+        self._lines = ("\t".join(map(_copy_value, row)) + "\n" for row in rows)
+        self._pending = ""
+    
+    def readable(self) -> bool:
+        return True
+    
+    def read(self, size: int = -1) -> str:
+        parts = [self._pending]
+        length = len(self._pending)
+        while size < 0 or length < size:
+            line = next(self._lines, None)
+            if line is None:
+                break
+            parts.append(line)
+            length += len(line)
+        data = "".join(parts)
+        if size < 0 or length <= size:
+            self._pending = ""
+            return data
+        self._pending = data[size:]
+        return data[:size]
 
 
 def save_tweets(tweets: list[Tweet]) -> int:
@@ -247,52 +403,44 @@ def save_tweets(tweets: list[Tweet]) -> int:
     if not tweets:
         return 0
     
-    conn = None
-    try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        # 准备数据
-        data = []
-        for t in tweets:
-            # 将 raw_json 转为 JSON 字符串
-            import json
-            raw_json_str = json.dumps(t.raw_json) if t.raw_json else None
-            
-            data.append((
-                t.author,
-                t.author_name,
-                t.content,
-                t.tweet_url,
-                t.voice_file,
-                t.voice_text,
-                t.likes,
-                t.retweets,
-                t.views,
-                t.created_at,
-                t.tweet_id,
-                t.reply_count,
-                t.quote_count,
-                t.user_followers,
-                t.user_friends,
-                t.user_description,
-                t.data_source,
-                raw_json_str
-            ))
+    # 准备数据，一次遍历按有无 tweet_id 分好（XHR 数据有 ID，OCR 数据没有）
+    data_with_id = []
+    data_without_id = []
+    for t in tweets:
+        # 将 raw_json 转为 JSON 字符串
+        raw_json_str = _encode_raw_json(t.raw_json) if t.raw_json else None
         
-        # 分离有 tweet_id 和没有 tweet_id 的数据
-        data_with_id = [d for d in data if d[10] is not None]  # d[10] = tweet_id
-        data_without_id = [d for d in data if d[10] is None]
+        row = (
+            t.author,
+            t.author_name,
+            t.content,
+            t.tweet_url,
+            t.voice_file,
+            t.voice_text,
+            t.likes,
+            t.retweets,
+            t.views,
+            t.created_at,
+            t.tweet_id,
+            t.reply_count,
+            t.quote_count,
+            t.user_followers,
+            t.user_friends,
+            t.user_description,
+            t.data_source,
+            raw_json_str
+        )
+        if t.tweet_id is not None:
+            data_with_id.append(row)
+        else:
+            data_without_id.append(row)
+    
+    try:
+        with db_connection() as conn, conn.cursor() as cur:
+            columns = ", ".join(TWEET_COLUMNS)
         
-        # 有 tweet_id 的使用 ON CONFLICT
-        if data_with_id:
-            sql_with_conflict = """
-                INSERT INTO tweets 
-                (author, author_name, content, tweet_url, voice_file, voice_text, 
-                 likes, retweets, views, created_at,
-                 tweet_id, reply_count, quote_count, user_followers, user_friends, 
-                 user_description, data_source, raw_json)
-                VALUES %s
+            # 有 tweet_id 的使用 ON CONFLICT
+            upsert = """
                 ON CONFLICT (tweet_id) 
                 DO UPDATE SET
                     likes = EXCLUDED.likes,
@@ -301,31 +449,34 @@ def save_tweets(tweets: list[Tweet]) -> int:
                     quote_count = EXCLUDED.quote_count,
                     views = EXCLUDED.views
             """
-            execute_values(cur, sql_with_conflict, data_with_id)
+            if len(data_with_id) >= COPY_THRESHOLD:
+                # COPY 不支持 ON CONFLICT：先灌进事务内临时表，再一条 INSERT ... SELECT 合并
+                cur.execute("CREATE TEMP TABLE tweets_stage (LIKE tweets INCLUDING DEFAULTS) ON COMMIT DROP")
+                cur.copy_expert(
+                    f"COPY tweets_stage ({columns}) FROM STDIN WITH (FORMAT text)",
+                    _CopyReader(data_with_id)
+                )
+                cur.execute(f"INSERT INTO tweets ({columns}) SELECT {columns} FROM tweets_stage {upsert}")
+            elif data_with_id:
+                execute_values(
+                    cur, f"INSERT INTO tweets ({columns}) VALUES %s {upsert}",
+                    data_with_id, page_size=INSERT_PAGE_SIZE
+                )
         
-        # 没有 tweet_id 的直接插入
-        if data_without_id:
-            sql_normal = """
-                INSERT INTO tweets 
-                (author, author_name, content, tweet_url, voice_file, voice_text, 
-                 likes, retweets, views, created_at,
-                 tweet_id, reply_count, quote_count, user_followers, user_friends, 
-                 user_description, data_source, raw_json)
-                VALUES %s
-            """
-            execute_values(cur, sql_normal, data_without_id)
+            # 没有 tweet_id 的不会冲突，直接 COPY，跳过逐行解析
+            if data_without_id:
+                cur.copy_expert(
+                    f"COPY tweets ({columns}) FROM STDIN WITH (FORMAT text)",
+                    _CopyReader(data_without_id)
+                )
         
-        conn.commit()
-        return len(data)
+            conn.commit()
+            _invalidate_recent_cache()
+            return len(tweets)
         
     except psycopg2.Error as e:
         print(f"❌ 数据库错误: {e}")
-        if conn:
-            conn.rollback()
         return 0
-    finally:
-        if conn:
-            conn.close()
 
 
 def save_ocr_result(ocr_text: str) -> tuple[int, list[Tweet]]:
@@ -343,60 +494,64 @@ def save_ocr_result(ocr_text: str) -> tuple[int, list[Tweet]]:
     return saved, tweets
 
 
-def mark_liked(tweet_url: str = None, tweet_id: int = None, liked: bool = True) -> bool:
+_db_executor: Optional[ThreadPoolExecutor] = None
+
+
+def save_ocr_result_async(ocr_text: str) -> Future:
     """
-    标记推文为已点赞
+    在后台线程解析并保存 OCR 结果，调用方可以同时继续做别的事
     
-    Args:
-        tweet_url: 推文 URL（优先）
-        tweet_id: 数据库 ID
-        liked: True=点赞, False=取消点赞
+    连接来自线程安全的连接池；进程退出前会等待未完成的写入
     
     Returns:
-        是否成功
+        Future，结果为 (保存数量, 推文列表)
+    """
+    global _db_executor
+    if _db_executor is None:
+        _db_executor = ThreadPoolExecutor(max_workers=DB_POOL_MAX, thread_name_prefix="tweet_db")
+    return _db_executor.submit(save_ocr_result, ocr_text)
+
+
+def _mark_tweet(flag_column: str, time_column: str, value: bool,
+                tweet_url: str = None, tweet_id: int = None) -> bool:
+    """
+    设置推文的状态标记及其时间戳（value 为 True 时记录 NOW()，否则清空）
+    
+    flag_column / time_column 只由本模块传入固定列名，不拼接外部输入
     """
     if not tweet_url and not tweet_id:
         return False
     
-    conn = None
+    # tweet_url 优先，否则按数据库 ID 更新
+    where = "tweet_url = %s" if tweet_url else "id = %s"
+    sql = (
+        f"UPDATE tweets SET {flag_column} = %s, "
+        f"{time_column} = CASE WHEN %s THEN NOW() ELSE NULL END WHERE {where}"
+    )
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        if liked:
-            if tweet_url:
-                cur.execute(
-                    "UPDATE tweets SET is_liked = TRUE, liked_at = NOW() WHERE tweet_url = %s",
-                    (tweet_url,)
-                )
-            else:
-                cur.execute(
-                    "UPDATE tweets SET is_liked = TRUE, liked_at = NOW() WHERE id = %s",
-                    (tweet_id,)
-                )
-        else:
-            if tweet_url:
-                cur.execute(
-                    "UPDATE tweets SET is_liked = FALSE, liked_at = NULL WHERE tweet_url = %s",
-                    (tweet_url,)
-                )
-            else:
-                cur.execute(
-                    "UPDATE tweets SET is_liked = FALSE, liked_at = NULL WHERE id = %s",
-                    (tweet_id,)
-                )
-        
-        conn.commit()
-        return cur.rowcount > 0
+        with db_connection() as conn, conn.cursor() as cur:
+            cur.execute(sql, (value, value, tweet_url or tweet_id))
+            conn.commit()
+            return cur.rowcount > 0
         
     except psycopg2.Error as e:
         print(f"❌ 数据库错误: {e}")
-        if conn:
-            conn.rollback()
         return False
-    finally:
-        if conn:
-            conn.close()
+
+
+def mark_liked(tweet_url: str = None, tweet_id: int = None, liked: bool = True) -> bool:
+    """
+    标记推文为已点赞
+    
+    Args:
+        tweet_url: 推文 URL（优先）
+        tweet_id: 数据库 ID
+        liked: True=点赞, False=取消点赞
+    
+    Returns:
+        是否成功
+    """
+    return _mark_tweet("is_liked", "liked_at", liked, tweet_url, tweet_id)
 
 
 def mark_bookmarked(tweet_url: str = None, tweet_id: int = None, bookmarked: bool = True) -> bool:
@@ -411,72 +566,110 @@ def mark_bookmarked(tweet_url: str = None, tweet_id: int = None, bookmarked: boo
     Returns:
         是否成功
     """
-    if not tweet_url and not tweet_id:
-        return False
+    return _mark_tweet("is_bookmarked", "bookmarked_at", bookmarked, tweet_url, tweet_id)
+
+
+def _mark_tweets_bulk(flag_column: str, time_column: str, value: bool, tweet_urls: list[str]) -> int:
+    """按 URL 批量设置状态标记，一条 UPDATE ... FROM (VALUES ...) 完成"""
+    if not tweet_urls:
+        return 0
     
-    conn = None
+    # execute_values 的 SQL 只能有一个 %s 占位符，标记值按固定字面量写入
+    flag_value, time_value = ("TRUE", "NOW()") if value else ("FALSE", "NULL")
+    sql = (
+        f"UPDATE tweets SET {flag_column} = {flag_value}, {time_column} = {time_value} "
+        f"FROM (VALUES %s) AS v(url) WHERE tweets.tweet_url = v.url"
+    )
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        if bookmarked:
-            if tweet_url:
-                cur.execute(
-                    "UPDATE tweets SET is_bookmarked = TRUE, bookmarked_at = NOW() WHERE tweet_url = %s",
-                    (tweet_url,)
-                )
-            else:
-                cur.execute(
-                    "UPDATE tweets SET is_bookmarked = TRUE, bookmarked_at = NOW() WHERE id = %s",
-                    (tweet_id,)
-                )
-        else:
-            if tweet_url:
-                cur.execute(
-                    "UPDATE tweets SET is_bookmarked = FALSE, bookmarked_at = NULL WHERE tweet_url = %s",
-                    (tweet_url,)
-                )
-            else:
-                cur.execute(
-                    "UPDATE tweets SET is_bookmarked = FALSE, bookmarked_at = NULL WHERE id = %s",
-                    (tweet_id,)
-                )
-        
-        conn.commit()
-        return cur.rowcount > 0
+        with db_connection() as conn, conn.cursor() as cur:
+            # 一页发完，rowcount 才是总更新行数
+            execute_values(cur, sql, [(url,) for url in tweet_urls], page_size=len(tweet_urls))
+            conn.commit()
+            return cur.rowcount
         
     except psycopg2.Error as e:
         print(f"❌ 数据库错误: {e}")
-        if conn:
-            conn.rollback()
-        return False
-    finally:
-        if conn:
-            conn.close()
+        return 0
+
+
+def mark_liked_bulk(tweet_urls: list[str], liked: bool = True) -> int:
+    """
+    批量标记推文点赞状态
+    
+    Args:
+        tweet_urls: 推文 URL 列表
+        liked: True=点赞, False=取消点赞
+    
+    Returns:
+        更新的行数
+    """
+    return _mark_tweets_bulk("is_liked", "liked_at", liked, tweet_urls)
+
+
+def mark_bookmarked_bulk(tweet_urls: list[str], bookmarked: bool = True) -> int:
+    """
+    批量标记推文收藏状态
+    
+    Args:
+        tweet_urls: 推文 URL 列表
+        bookmarked: True=收藏, False=取消收藏
+    
+    Returns:
+        更新的行数
+    """
+    return _mark_tweets_bulk("is_bookmarked", "bookmarked_at", bookmarked, tweet_urls)
+
+
+def iter_json_array(text: str, start: int = 0):
+    """
+    逐个解码 JSON 数组的元素（text[start] 应为 "["）
+    
+    不一次性构造整个列表，调用方可以边解码边分批处理
+    """
+    end = _JSON_WHITESPACE.match(text, start + 1).end()
+    if text[end:end + 1] == "]":
+        return
+    while True:
+        item, end = _JSON_DECODER.raw_decode(text, end)
+        yield item
+        end = _JSON_WHITESPACE.match(text, end).end()
+        delimiter = text[end:end + 1]
+        if delimiter == "]":
+            return
+        if delimiter != ",":
+            raise json.JSONDecodeError("Expecting ',' delimiter", text, end)
+        end = _JSON_WHITESPACE.match(text, end + 1).end()
 
 
 def save_xhr_tweets_from_json(json_file: str) -> int:
     """
     从 XHR 拦截的 JSON 文件批量保存推文
     
+    按 XHR_IMPORT_BATCH 条一批解码并写入，内存只保留一批的推文对象
+    
     Args:
         json_file: JSON 文件路径（tweets_xhr_test.json 等）
     
     Returns:
         成功保存的推文数量
     """
-    import json
-    
+    saved = 0
     try:
         with open(json_file, 'r', encoding='utf-8') as f:
-            data_list = json.load(f)
+            text = f.read()
         
-        if not isinstance(data_list, list):
+        start = _JSON_WHITESPACE.match(text).end()
+        if text[start:start + 1] != "[":
             print(f"❌ JSON 文件格式错误，期望列表")
             return 0
         
-        tweets = [tweet_from_xhr_json(d) for d in data_list]
-        saved = save_tweets(tweets)
+        batch = []
+        for d in iter_json_array(text, start):
+            batch.append(tweet_from_xhr_json(d))
+            if len(batch) >= XHR_IMPORT_BATCH:
+                saved += save_tweets(batch)
+                batch = []
+        saved += save_tweets(batch)
         print(f"✅ 从 {json_file} 保存了 {saved} 条推文")
         return saved
         
@@ -484,59 +677,108 @@ def save_xhr_tweets_from_json(json_file: str) -> int:
         print(f"❌ 文件不存在: {json_file}")
         return 0
     except json.JSONDecodeError as e:
-        print(f"❌ JSON 解析失败: {e}")
-        return 0
+        # 出错前已写入的批次不会回滚
+        print(f"❌ JSON 解析失败: {e}（已保存 {saved} 条）")
+        return saved
+
+
+# (limit, data_source, before) -> (写入时间, 行)；按最近使用排序，超出 RECENT_CACHE_MAX_ENTRIES 时淘汰最久未用的
+_recent_cache: OrderedDict[tuple, tuple[float, list[dict]]] = OrderedDict()
+# save_tweets 在后台线程里失效缓存，读写缓存都要持锁；
+# 每次失效 generation 加一，查询期间发生过写入时不把旧结果放回缓存
+_recent_cache_lock = threading.Lock()
+_recent_cache_generation = 0
+
+
+def _invalidate_recent_cache() -> None:
+    """写入数据库后清空查询缓存"""
+    global _recent_cache_generation
+    with _recent_cache_lock:
+        _recent_cache.clear()
+        _recent_cache_generation += 1
+
 
+def _cached_recent(key: tuple) -> tuple[list[dict] | None, int]:
+    """查缓存，返回 (命中的行或 None, 当前 generation)"""
+    with _recent_cache_lock:
+        cached = _recent_cache.get(key)
+        if cached and time.monotonic() - cached[0] < RECENT_CACHE_TTL:
+            _recent_cache.move_to_end(key)
+            return cached[1], _recent_cache_generation
+        return None, _recent_cache_generation
 
-def get_recent_tweets(limit: int = 20, data_source: str = None) -> list[dict]:
+
+def _cache_recent(key: tuple, rows: list[dict], generation: int) -> None:
+    """写入查询缓存：generation 已变（查询期间有写入）时放弃；先丢掉已过期的条目，再按 LRU 限制条目数"""
+    with _recent_cache_lock:
+        if generation != _recent_cache_generation:
+            return
+        now = time.monotonic()
+        for stale in [k for k, (cached_at, _) in _recent_cache.items() if now - cached_at >= RECENT_CACHE_TTL]:
+            del _recent_cache[stale]
+        _recent_cache[key] = (now, rows)
+        _recent_cache.move_to_end(key)
+        while len(_recent_cache) > RECENT_CACHE_MAX_ENTRIES:
+            _recent_cache.popitem(last=False)
+
+
+def get_recent_tweets(
+    limit: int = 20,
+    data_source: str = None,
+    before: Optional[datetime] = None,
+) -> list[dict]:
     """
     获取最近保存的推文
     
     Args:
         limit: 返回数量
         data_source: 筛选来源 ('ocr', 'xhr', None=全部)
+        before: 只返回 scraped_at 早于该时间的推文（keyset 分页：传入上一页最后一条的 scraped_at）
     
     Returns:
         推文列表
     """
-    conn = None
+    key = (limit, data_source, before)
+    cached, generation = _cached_recent(key)
+    if cached is not None:
+        # 每次返回新的 dict，调用方修改结果不会改到缓存里的行
+        return [dict(row) for row in cached]
+    
+    conditions = []
+    params = []
+    if data_source:
+        conditions.append("data_source = %s")
+        params.append(data_source)
+    if before:
+        conditions.append("scraped_at < %s")
+        params.append(before)
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    params.append(limit)
+    
     try:
-        conn = get_db_connection()
-        cur = conn.cursor()
-        
-        if data_source:
-            cur.execute("""
-                SELECT id, scraped_at, author, author_name, content, 
-                       likes, retweets, views, reply_count, data_source, tweet_id
-                FROM tweets 
-                WHERE data_source = %s
-                ORDER BY scraped_at DESC 
-                LIMIT %s
-            """, (data_source, limit))
-        else:
-            cur.execute("""
+        with db_connection() as conn, conn.cursor(cursor_factory=RealDictCursor) as cur:
+            # ORDER BY scraped_at DESC 走 idx_tweets_scraped_at，无需排序
+            cur.execute(f"""
                 SELECT id, scraped_at, author, author_name, content, 
                        likes, retweets, views, reply_count, data_source, tweet_id
                 FROM tweets 
+                {where}
                 ORDER BY scraped_at DESC 
                 LIMIT %s
-            """, (limit,))
+            """, params)
         
-        columns = [desc[0] for desc in cur.description]
-        return [dict(zip(columns, row)) for row in cur.fetchall()]
+            rows = cur.fetchall()
         
     except psycopg2.Error as e:
         print(f"❌ 数据库错误: {e}")
         return []
-    finally:
-        if conn:
-            conn.close()
+    
+    _cache_recent(key, [dict(row) for row in rows], generation)
+    return [dict(row) for row in rows]
 
 
 # CLI 测试入口
 if __name__ == "__main__":
-    import sys
-    
     if len(sys.argv) > 1:
         if sys.argv[1] == "list":
             # 列出最近的推文
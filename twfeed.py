@@ -7,17 +7,14 @@ Twitter 时间线抓取 + 互动工具
 """
 
 import argparse
-import subprocess
+import os
 import sys
 import tempfile
 import time
 from pathlib import Path
 
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
-
-from chrome_utils import CDP_URL, ensure_chrome_cdp
-from twitter_actions import like_tweet, unlike_tweet, bookmark_tweet, unbookmark_tweet
-from tweet_db import save_ocr_result, get_recent_tweets
+from chrome_utils import CDP_URL, acquire_page, ensure_chrome_cdp, release_page, route_keeping_cache
+from ocr_client import run_paddle_ocr
 
 
 # 页面类型映射
@@ -43,32 +40,103 @@ FEED_NAMES = {
 DEFAULT_WIDTH = 1280
 DEFAULT_HEIGHT = 4000  # 高纵向分辨率
 
-# PaddleOCR 脚本路径
-PADDLE_OCR_DIR = Path.home() / "paddle-ocr"
+# 页面稳定等待上限 (ms)：条件满足即继续，最坏情况与原来的固定 sleep 相同
+SETTLE_TIMEOUT = 2000
+SCROLL_TIMEOUT = 1500
+NEXT_FRAME_JS = "() => new Promise(r => requestAnimationFrame(() => requestAnimationFrame(r)))"
 
+# OCR 只需要文字：图片、视频、字体请求直接丢弃（样式要保留，否则排版会乱）
+OCR_BLOCKED_RESOURCE_TYPES = frozenset({"image", "media", "font"})
 
-def run_paddle_ocr(image_path: str) -> str | None:
-    """调用 PaddleOCR 识别图片（默认纯文本输出）"""
-    try:
-        result = subprocess.run(
-            ["uv", "run", "python", "ocr.py", image_path],
-            cwd=PADDLE_OCR_DIR,
-            capture_output=True,
-            text=True,
-            timeout=60,
-            env={
-                **dict(__import__("os").environ),
-                "PADDLE_PDX_DISABLE_MODEL_SOURCE_CHECK": "True"
-            }
+# 截图按推文边界切成几块，一次批量送给 OCR
+OCR_TILES = 4
+# OCR 用截图走 JPEG：编码比 PNG 快得多，文件小，对识别率无影响
+OCR_JPEG_QUALITY = 85
+# 临时截图放内存盘 (tmpfs)，OCR 进程按路径读取时不落磁盘
+SCREENSHOT_DIR = "/dev/shm" if os.path.isdir("/dev/shm") else None
+ITEM_TOPS_JS = """() => Array.from(
+    document.querySelectorAll('[data-testid="cellInnerDiv"]'),
+    el => el.getBoundingClientRect().top,
+)"""
+# 被 viewport 底边截断的第一个条目的顶部（只看吸顶栏以下的条目）；没有则为 viewport 高度
+FRAME_BOTTOM_JS = """headerBottom => {
+    const h = window.innerHeight;
+    for (const el of document.querySelectorAll('[data-testid="cellInnerDiv"]')) {
+        const r = el.getBoundingClientRect();
+        if (r.top > headerBottom && r.top < h && r.bottom > h) return Math.floor(r.top);
+    }
+    return h;
+}"""
+# 主列里吸附在 viewport 顶部的栏（为你推荐/正在关注 标签等）的底边；没有则为 0。
+# 滚动后它会盖住屏幕最上面那一条，续截的条目要从它下面开始
+STICKY_HEADER_BOTTOM_JS = """() => {
+    const col = document.querySelector('[data-testid="primaryColumn"]');
+    if (!col) return 0;
+    const walker = document.createTreeWalker(col, NodeFilter.SHOW_ELEMENT, {
+        acceptNode: el => el.dataset.testid === "cellInnerDiv"
+            ? NodeFilter.FILTER_REJECT : NodeFilter.FILTER_ACCEPT,
+    });
+    let bottom = 0;
+    for (let el = walker.nextNode(); el; el = walker.nextNode()) {
+        if (getComputedStyle(el).position !== "sticky") continue;
+        const r = el.getBoundingClientRect();
+        if (r.top <= 1 && r.bottom > bottom && r.bottom < window.innerHeight / 2) bottom = r.bottom;
+    }
+    return Math.ceil(bottom);
+}"""
+
+def block_media(route) -> None:
+    """拦截 OCR 用不到的资源请求"""
+    if route.request.resource_type in OCR_BLOCKED_RESOURCE_TYPES:
+        route.abort()
+    else:
+        route.continue_()
+
+
+def primary_column(page) -> tuple[float, float]:
+    """时间线主列的横向范围 (x, width)，两侧边栏（趋势、推荐关注）不参与 OCR"""
+    box = page.locator('[data-testid="primaryColumn"]').bounding_box()
+    if not box:
+        return 0, DEFAULT_WIDTH
+    return box["x"], box["width"]
+
+
+def split_at_items(
+    page, x: float, width: float, top: int, bottom: int, tiles: int = OCR_TILES
+) -> list[dict]:
+    """按时间线条目边界把 viewport 的 [top, bottom) 切成若干纵向截图区域，避免把一行字切成两半"""
+    tops = [int(t) for t in page.evaluate(ITEM_TOPS_JS) if top < t < bottom]
+    cuts = [top]
+    for i in range(1, tiles):
+        candidates = [t for t in tops if t > cuts[-1]]
+        if not candidates:
+            break
+        target = top + (bottom - top) * i // tiles
+        cuts.append(min(candidates, key=lambda t: abs(t - target)))
+    cuts.append(bottom)
+    return [
+        {"x": x, "y": y0, "width": width, "height": y1 - y0}
+        for y0, y1 in zip(cuts, cuts[1:])
+    ]
+
+
+def capture_tiles(page, clips: list[dict], screenshot_paths: list[str]) -> None:
+    """按区域截图到临时文件，路径追加到 screenshot_paths"""
+    for clip in clips:
+        with tempfile.NamedTemporaryFile(suffix=".jpg", dir=SCREENSHOT_DIR, delete=False) as f:
+            screenshot_paths.append(f.name)
+        page.screenshot(
+            path=screenshot_paths[-1], clip=clip, type="jpeg", quality=OCR_JPEG_QUALITY
         )
-        if result.returncode == 0:
-            return result.stdout.strip()
-        else:
-            print(f"❌ OCR 失败: {result.stderr}", file=sys.stderr)
-            return None
+
+
+def report_db_save(future) -> None:
+    """后台数据库保存完成后的回调"""
+    try:
+        saved_count, _ = future.result()
+        print(f"💾 已保存 {saved_count} 条推文到数据库", file=sys.stderr)
     except Exception as e:
-        print(f"❌ OCR 错误: {e}", file=sys.stderr)
-        return None
+        print(f"⚠️ 数据库保存失败: {e}", file=sys.stderr)
 
 
 def capture_feed(
@@ -93,6 +161,9 @@ def capture_feed(
     Returns:
         OCR 提取的文字内容，失败返回 None
     """
+    # playwright 导入较慢，只在真正抓取时加载（--list/--help 用不到）
+    from playwright.sync_api import TimeoutError as PlaywrightTimeout
+
     total_start = time.time()
     timings = {}
     
@@ -107,105 +178,126 @@ def capture_feed(
     
     feed_name = FEED_NAMES.get(feed_type, feed_type)
 
-    with sync_playwright() as p:
+    step_start = time.time()
+    try:
+        page = acquire_page()
+    except Exception as e:
+        print(f"❌ 无法连接 CDP ({CDP_URL}): {e}", file=sys.stderr)
+        return None
+    timings['cdp_connect'] = time.time() - step_start
+
+    screenshot_paths = []
+
+    try:
+        # 设置大的 viewport 高度（release_page 会恢复原尺寸）
+        page.set_viewport_size({"width": DEFAULT_WIDTH, "height": height})
+        # 拦截规则会让 Playwright 关掉 HTTP 缓存，这里重新打开；页面归还连接池时会清掉拦截规则
+        route_keeping_cache(page, block_media)
+        print(f"📍 导航到 Twitter {feed_name}...", file=sys.stderr)
         step_start = time.time()
+        page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        
+        # 等待内容加载
         try:
-            browser = p.chromium.connect_over_cdp(CDP_URL)
-        except Exception as e:
-            print(f"❌ 无法连接 CDP ({CDP_URL}): {e}", file=sys.stderr)
-            return None
-        timings['cdp_connect'] = time.time() - step_start
-
-        context = browser.contexts[0]
-        page = context.new_page()
+            page.wait_for_selector('[data-testid="tweet"]', timeout=30000)
+        except PlaywrightTimeout:
+            # 有些页面可能没有推文，尝试等待其他元素
+            page.wait_for_selector('[data-testid="primaryColumn"]', timeout=10000)
         
-        # 设置大的 viewport 高度
-        page.set_viewport_size({"width": DEFAULT_WIDTH, "height": height})
-
+        # 等首屏请求告一段落（时间线会一直有长连接，所以只等到上限为止）
         try:
-            print(f"📍 导航到 Twitter {feed_name}...", file=sys.stderr)
+            page.wait_for_load_state("networkidle", timeout=SETTLE_TIMEOUT)
+        except PlaywrightTimeout:
+            pass
+        timings['navigation'] = time.time() - step_start
+        
+        # 保存截图（如果指定了路径，格式按扩展名决定；与原来一样是页面顶部）
+        if output_image:
+            page.screenshot(path=output_image, full_page=False)
+            print(f"💾 截图已保存: {output_image}", file=sys.stderr)
+        
+        # 逐屏截图：每屏只截到被底边截断的条目之前，该条目滚到吸顶栏下面作为下一屏的开头，
+        # 各屏拼起来既不重叠也不会切断文字，也不用再滚回顶部重截
+        print("📸 截图中...", file=sys.stderr)
+        x, width = primary_column(page)
+        start = 0
+        for i in range(scroll_times + 1):
             step_start = time.time()
-            page.goto(url, wait_until="domcontentloaded", timeout=60000)
-            
-            # 等待内容加载
-            try:
-                page.wait_for_selector('[data-testid="tweet"]', timeout=30000)
-            except PlaywrightTimeout:
-                # 有些页面可能没有推文，尝试等待其他元素
-                page.wait_for_selector('[data-testid="primaryColumn"]', timeout=10000)
-            
-            time.sleep(2)
-            timings['navigation'] = time.time() - step_start
+            last_frame = i == scroll_times
+            header_bottom = page.evaluate(STICKY_HEADER_BOTTOM_JS)
+            bottom = height if last_frame else page.evaluate(FRAME_BOTTOM_JS, header_bottom)
+            if bottom <= start:
+                # 单个条目比剩余区域还高，只能整屏截
+                bottom = height
+            capture_tiles(page, split_at_items(page, x, width, start, bottom), screenshot_paths)
+            timings['screenshot'] = timings.get('screenshot', 0) + time.time() - step_start
+            if last_frame:
+                break
             
             # 滚动加载更多内容
+            print(f"📜 滚动加载 ({i + 1}/{scroll_times})...", file=sys.stderr)
             step_start = time.time()
-            for i in range(scroll_times):
-                print(f"📜 滚动加载 ({i + 1}/{scroll_times})...", file=sys.stderr)
-                page.evaluate("window.scrollBy(0, window.innerHeight)")
-                time.sleep(1.5)
-            
-            # 滚动回顶部
-            page.evaluate("window.scrollTo(0, 0)")
-            time.sleep(0.5)
-            timings['scrolling'] = time.time() - step_start
-            
-            # 截图
-            with tempfile.NamedTemporaryFile(suffix=".png", delete=False) as f:
-                screenshot_path = f.name
-            
-            print("📸 截图中...", file=sys.stderr)
-            step_start = time.time()
-            page.screenshot(path=screenshot_path, full_page=False)
-            timings['screenshot'] = time.time() - step_start
-            
-            # 保存截图（如果指定了路径）
-            if output_image:
-                import shutil
-                shutil.copy(screenshot_path, output_image)
-                print(f"💾 截图已保存: {output_image}", file=sys.stderr)
-            
-            # PaddleOCR 提取文字
-            print("🔍 OCR 识别中 (PaddleOCR)...", file=sys.stderr)
-            step_start = time.time()
-            result = run_paddle_ocr(screenshot_path)
-            timings['ocr'] = time.time() - step_start
-            
-            # 清理临时文件
-            Path(screenshot_path).unlink(missing_ok=True)
-            
-            if not result:
-                print("❌ OCR 未识别到文字", file=sys.stderr)
-                return None
-            
-            # 打印计时统计
-            timings['total'] = time.time() - total_start
-            print(f"✅ OCR 完成", file=sys.stderr)
-            print(f"⏱️  计时统计:", file=sys.stderr)
-            print(f"   CDP连接: {timings.get('cdp_connect', 0):.2f}s", file=sys.stderr)
-            print(f"   页面加载: {timings.get('navigation', 0):.2f}s", file=sys.stderr)
-            print(f"   滚动加载: {timings.get('scrolling', 0):.2f}s", file=sys.stderr)
-            print(f"   截图: {timings.get('screenshot', 0):.2f}s", file=sys.stderr)
-            print(f"   OCR: {timings.get('ocr', 0):.2f}s", file=sys.stderr)
-            print(f"   总计: {timings.get('total', 0):.2f}s", file=sys.stderr)
-            
-            # 保存到数据库
-            if save_to_db:
-                try:
-                    saved_count, tweets = save_ocr_result(result)
-                    print(f"💾 已保存 {saved_count} 条推文到数据库", file=sys.stderr)
-                except Exception as e:
-                    print(f"⚠️ 数据库保存失败: {e}", file=sys.stderr)
-            
-            return result
-
-        except PlaywrightTimeout as e:
-            print(f"❌ 超时: {e}", file=sys.stderr)
-            return None
-        except Exception as e:
-            print(f"❌ 错误: {e}", file=sys.stderr)
+            scroll_height = page.evaluate("document.documentElement.scrollHeight")
+            scrolled = page.evaluate(
+                "y => { const before = window.scrollY; window.scrollBy(0, y); return window.scrollY - before; }",
+                bottom - header_bottom,
+            )
+            # 新内容加载进来后页面会变高
+            try:
+                page.wait_for_function(
+                    "h => document.documentElement.scrollHeight > h",
+                    arg=scroll_height,
+                    timeout=SCROLL_TIMEOUT,
+                )
+            except PlaywrightTimeout:
+                pass
+            page.evaluate(NEXT_FRAME_JS)
+            timings['scrolling'] = timings.get('scrolling', 0) + time.time() - step_start
+            if scrolled <= 0:
+                # 已经到底
+                break
+            # 被截断的条目现在紧贴吸顶栏下沿；到底时滚动距离不足，已截过的部分还留在屏幕上方
+            start = max(header_bottom, bottom - scrolled)
+        
+        # PaddleOCR 提取文字
+        print(f"🔍 OCR 识别中 (PaddleOCR, {len(screenshot_paths)} 块)...", file=sys.stderr)
+        step_start = time.time()
+        result = run_paddle_ocr(*screenshot_paths)
+        timings['ocr'] = time.time() - step_start
+        
+        if not result:
+            print("❌ OCR 未识别到文字", file=sys.stderr)
             return None
-        finally:
-            page.close()
+        
+        # 打印计时统计
+        timings['total'] = time.time() - total_start
+        print(f"✅ OCR 完成", file=sys.stderr)
+        print(f"⏱️  计时统计:", file=sys.stderr)
+        print(f"   CDP连接: {timings.get('cdp_connect', 0):.2f}s", file=sys.stderr)
+        print(f"   页面加载: {timings.get('navigation', 0):.2f}s", file=sys.stderr)
+        print(f"   滚动加载: {timings.get('scrolling', 0):.2f}s", file=sys.stderr)
+        print(f"   截图: {timings.get('screenshot', 0):.2f}s", file=sys.stderr)
+        print(f"   OCR: {timings.get('ocr', 0):.2f}s", file=sys.stderr)
+        print(f"   总计: {timings.get('total', 0):.2f}s", file=sys.stderr)
+        
+        # 后台保存到数据库，不阻塞返回（关闭页面、输出结果与写库并行，进程退出前等待写入完成）
+        if save_to_db:
+            from tweet_db import save_ocr_result_async
+            save_ocr_result_async(result).add_done_callback(report_db_save)
+        
+        return result
+
+    except PlaywrightTimeout as e:
+        print(f"❌ 超时: {e}", file=sys.stderr)
+        return None
+    except Exception as e:
+        print(f"❌ 错误: {e}", file=sys.stderr)
+        return None
+    finally:
+        # 清理临时文件
+        for screenshot_path in screenshot_paths:
+            Path(screenshot_path).unlink(missing_ok=True)
+        release_page(page)
 
 
 def main():
@@ -225,6 +317,7 @@ def main():
   twfeed --list                  # 查看最近保存的推文
   
   twfeed like URL                # 点赞推文
+  twfeed like URL1 URL2 ...      # 批量点赞
   twfeed unlike URL              # 取消点赞
   twfeed bookmark URL            # 收藏推文
   twfeed unbookmark URL          # 取消收藏
@@ -243,19 +336,19 @@ def main():
     
     # like 子命令
     like_parser = subparsers.add_parser("like", help="点赞推文")
-    like_parser.add_argument("url", help="推文 URL")
+    like_parser.add_argument("urls", nargs="+", metavar="url", help="推文 URL (可多个)")
     
     # unlike 子命令
     unlike_parser = subparsers.add_parser("unlike", help="取消点赞")
-    unlike_parser.add_argument("url", help="推文 URL")
+    unlike_parser.add_argument("urls", nargs="+", metavar="url", help="推文 URL (可多个)")
     
     # bookmark 子命令
     bookmark_parser = subparsers.add_parser("bookmark", help="收藏推文")
-    bookmark_parser.add_argument("url", help="推文 URL")
+    bookmark_parser.add_argument("urls", nargs="+", metavar="url", help="推文 URL (可多个)")
     
     # unbookmark 子命令
     unbookmark_parser = subparsers.add_parser("unbookmark", help="取消收藏")
-    unbookmark_parser.add_argument("url", help="推文 URL")
+    unbookmark_parser.add_argument("urls", nargs="+", metavar="url", help="推文 URL (可多个)")
     
     # 刷推参数
     parser.add_argument("-t", "--type", choices=list(FEED_TYPES.keys()), default="home", help="页面类型")
@@ -272,25 +365,33 @@ def main():
     
     # Set headless mode via environment variable
     if args.headless:
-        import os
         os.environ["CHROME_HEADLESS"] = "1"
 
     # 处理互动命令
+    if args.command:
+        from twitter_actions import (
+            bookmark_tweet,
+            like_tweet,
+            run_batch,
+            unbookmark_tweet,
+            unlike_tweet,
+        )
     if args.command == "like":
-        success = like_tweet(args.url)
+        success = run_batch(like_tweet, args.urls)
         sys.exit(0 if success else 1)
     elif args.command == "unlike":
-        success = unlike_tweet(args.url)
+        success = run_batch(unlike_tweet, args.urls)
         sys.exit(0 if success else 1)
     elif args.command == "bookmark":
-        success = bookmark_tweet(args.url)
+        success = run_batch(bookmark_tweet, args.urls)
         sys.exit(0 if success else 1)
     elif args.command == "unbookmark":
-        success = unbookmark_tweet(args.url)
+        success = run_batch(unbookmark_tweet, args.urls)
         sys.exit(0 if success else 1)
     
     # 查看数据库中的推文
     if args.list_db:
+        from tweet_db import get_recent_tweets
         tweets = get_recent_tweets(20)
         if tweets:
             for t in tweets:
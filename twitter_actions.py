@@ -5,225 +5,170 @@ Twitter 互动功能模块
 - 收藏 / 取消收藏
 """
 
+import functools
 import re
-import time
+from contextlib import contextmanager
 
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+from playwright.sync_api import TimeoutError as PlaywrightTimeout
 
-from chrome_utils import CDP_URL, ensure_chrome_cdp
+from chrome_utils import CDP_URL, acquire_page, ensure_chrome_cdp, release_page
+
+
+# 点击后等待按钮切换状态的最长时间 (ms)
+TOGGLE_TIMEOUT = 3000
+
+# 页面加载完成的标志：任一状态的按钮出现
+LIKE_BUTTONS = '[data-testid="like"], [data-testid="unlike"]'
+BOOKMARK_BUTTONS = '[data-testid="bookmark"], [data-testid="removeBookmark"]'
+
+TWEET_ID_RE = re.compile(r"/status/(\d+)")
+
+
+def wait_for_toggle(page, selector: str) -> bool:
+    """等待点击后按钮切换为 selector 对应的状态"""
+    try:
+        page.locator(selector).first.wait_for(state="visible", timeout=TOGGLE_TIMEOUT)
+        return True
+    except PlaywrightTimeout:
+        return False
 
 
 def extract_tweet_id(url: str) -> str | None:
     """从 URL 提取推文 ID"""
-    match = re.search(r"/status/(\d+)", url)
+    match = TWEET_ID_RE.search(url)
     return match.group(1) if match else None
 
 
-def like_tweet(url: str) -> bool:
-    """点赞推文"""
-    if not ensure_chrome_cdp():
-        return False
+@contextmanager
+def tweet_page(url: str, wait_selector: str | None = None):
+    """打开推文页面（页面取自连接池），等待 wait_selector 出现后交给调用方，用完归还"""
+    try:
+        page = acquire_page()
+    except Exception as e:
+        raise ConnectionError(f"无法连接 CDP ({CDP_URL}): {e}") from e
+
+    try:
+        print("📍 导航到推文页面...")
+        page.goto(url, wait_until="domcontentloaded", timeout=60000)
+        if wait_selector:
+            page.wait_for_selector(wait_selector, timeout=30000)
+        yield page
+    finally:
+        release_page(page)
+
+
+def tweet_action(wait_selector: str):
+    """互动命令装饰器：检查 CDP 和 URL，打开推文页面后调用 func(page)，统一处理异常"""
+    def decorator(func):
+        # 只沿用名字和文档：包装后的参数是 url 而不是 page，不能让 inspect/IDE 顺着 __wrapped__ 显示 (page)
+        @functools.wraps(func, assigned=("__module__", "__name__", "__qualname__", "__doc__"))
+        def wrapper(url: str) -> bool:
+            if not ensure_chrome_cdp():
+                return False
 
-    tweet_id = extract_tweet_id(url)
-    if not tweet_id:
-        print(f"❌ 无效的推文 URL: {url}")
-        return False
+            if not extract_tweet_id(url):
+                print(f"❌ 无效的推文 URL: {url}")
+                return False
 
-    with sync_playwright() as p:
-        try:
-            browser = p.chromium.connect_over_cdp(CDP_URL)
-        except Exception as e:
-            print(f"❌ 无法连接 CDP ({CDP_URL}): {e}")
-            return False
-
-        context = browser.contexts[0]
-        page = context.new_page()
-
-        try:
-            print(f"📍 导航到推文页面...")
-            page.goto(url, wait_until="domcontentloaded", timeout=60000)
-            # 等待任一按钮出现 (like 或 unlike)
-            page.wait_for_selector('[data-testid="like"], [data-testid="unlike"]', timeout=30000)
-            time.sleep(1)
-
-            # 检查是否已点赞
-            unlike_btn = page.locator('[data-testid="unlike"]').first
-            
-            if unlike_btn.count() > 0:
-                print("⚠️ 这条推文已经点过赞了")
-                return True
-
-            print("❤️ 点赞中...")
-            like_btn = page.locator('[data-testid="like"]').first
-            like_btn.click()
-            time.sleep(1)
-
-            # 验证点赞成功
-            if page.locator('[data-testid="unlike"]').count() > 0:
-                print("✅ 点赞成功！")
-                return True
-            else:
-                print("❌ 点赞可能失败")
+            try:
+                with tweet_page(url, wait_selector) as page:
+                    return func(page)
+            except PlaywrightTimeout as e:
+                print(f"❌ 超时: {e}")
+                return False
+            except Exception as e:
+                print(f"❌ 错误: {e}")
                 return False
+        del wrapper.__wrapped__
+        return wrapper
+    return decorator
 
-        except PlaywrightTimeout as e:
-            print(f"❌ 超时: {e}")
-            return False
-        except Exception as e:
-            print(f"❌ 错误: {e}")
-            return False
-        finally:
-            page.close()
+
+@tweet_action(LIKE_BUTTONS)
+def like_tweet(page) -> bool:
+    """点赞推文"""
+    # 检查是否已点赞
+    if page.locator('[data-testid="unlike"]').first.count() > 0:
+        print("⚠️ 这条推文已经点过赞了")
+        return True
+
+    print("❤️ 点赞中...")
+    page.locator('[data-testid="like"]').first.click()
+
+    # 验证点赞成功
+    if wait_for_toggle(page, '[data-testid="unlike"]'):
+        print("✅ 点赞成功！")
+        return True
+    else:
+        print("❌ 点赞可能失败")
+        return False
 
 
-def unlike_tweet(url: str) -> bool:
+@tweet_action(LIKE_BUTTONS)
+def unlike_tweet(page) -> bool:
     """取消点赞"""
-    if not ensure_chrome_cdp():
-        return False
+    unlike_btn = page.locator('[data-testid="unlike"]').first
+
+    if unlike_btn.count() == 0:
+        print("⚠️ 这条推文没有点过赞")
+        return True
+
+    print("💔 取消点赞中...")
+    unlike_btn.click()
 
-    tweet_id = extract_tweet_id(url)
-    if not tweet_id:
-        print(f"❌ 无效的推文 URL: {url}")
+    if wait_for_toggle(page, '[data-testid="like"]'):
+        print("✅ 取消点赞成功！")
+        return True
+    else:
+        print("❌ 取消点赞可能失败")
         return False
 
-    with sync_playwright() as p:
-        try:
-            browser = p.chromium.connect_over_cdp(CDP_URL)
-        except Exception as e:
-            print(f"❌ 无法连接 CDP ({CDP_URL}): {e}")
-            return False
-
-        context = browser.contexts[0]
-        page = context.new_page()
-
-        try:
-            print(f"📍 导航到推文页面...")
-            page.goto(url, wait_until="domcontentloaded", timeout=60000)
-            time.sleep(2)
-
-            unlike_btn = page.locator('[data-testid="unlike"]').first
-            
-            if unlike_btn.count() == 0:
-                print("⚠️ 这条推文没有点过赞")
-                return True
-
-            print("💔 取消点赞中...")
-            unlike_btn.click()
-            time.sleep(1)
-
-            print("✅ 取消点赞成功！")
-            return True
-
-        except PlaywrightTimeout as e:
-            print(f"❌ 超时: {e}")
-            return False
-        except Exception as e:
-            print(f"❌ 错误: {e}")
-            return False
-        finally:
-            page.close()
-
-
-def bookmark_tweet(url: str) -> bool:
+
+@tweet_action(BOOKMARK_BUTTONS)
+def bookmark_tweet(page) -> bool:
     """收藏推文"""
-    if not ensure_chrome_cdp():
+    # 检查是否已收藏
+    if page.locator('[data-testid="removeBookmark"]').first.count() > 0:
+        print("⚠️ 这条推文已经收藏过了")
+        return True
+
+    print("🔖 收藏中...")
+    page.locator('[data-testid="bookmark"]').first.click()
+
+    # 验证收藏成功
+    if wait_for_toggle(page, '[data-testid="removeBookmark"]'):
+        print("✅ 收藏成功！")
+        return True
+    else:
+        print("❌ 收藏可能失败")
         return False
 
-    tweet_id = extract_tweet_id(url)
-    if not tweet_id:
-        print(f"❌ 无效的推文 URL: {url}")
-        return False
 
-    with sync_playwright() as p:
-        try:
-            browser = p.chromium.connect_over_cdp(CDP_URL)
-        except Exception as e:
-            print(f"❌ 无法连接 CDP ({CDP_URL}): {e}")
-            return False
-
-        context = browser.contexts[0]
-        page = context.new_page()
-
-        try:
-            print(f"📍 导航到推文页面...")
-            page.goto(url, wait_until="domcontentloaded", timeout=60000)
-            # 等待任一按钮出现 (bookmark 或 removeBookmark)
-            page.wait_for_selector('[data-testid="bookmark"], [data-testid="removeBookmark"]', timeout=30000)
-            time.sleep(1)
-
-            # 检查是否已收藏
-            unbookmark_btn = page.locator('[data-testid="removeBookmark"]').first
-            
-            if unbookmark_btn.count() > 0:
-                print("⚠️ 这条推文已经收藏过了")
-                return True
-
-            print("🔖 收藏中...")
-            bookmark_btn = page.locator('[data-testid="bookmark"]').first
-            bookmark_btn.click()
-            time.sleep(1)
-
-            # 验证收藏成功
-            if page.locator('[data-testid="removeBookmark"]').count() > 0:
-                print("✅ 收藏成功！")
-                return True
-            else:
-                print("❌ 收藏可能失败")
-                return False
+@tweet_action(BOOKMARK_BUTTONS)
+def unbookmark_tweet(page) -> bool:
+    """取消收藏"""
+    unbookmark_btn = page.locator('[data-testid="removeBookmark"]').first
 
-        except PlaywrightTimeout as e:
-            print(f"❌ 超时: {e}")
-            return False
-        except Exception as e:
-            print(f"❌ 错误: {e}")
-            return False
-        finally:
-            page.close()
+    if unbookmark_btn.count() == 0:
+        print("⚠️ 这条推文没有收藏过")
+        return True
 
+    print("🗑️ 取消收藏中...")
+    unbookmark_btn.click()
 
-def unbookmark_tweet(url: str) -> bool:
-    """取消收藏"""
-    if not ensure_chrome_cdp():
+    if wait_for_toggle(page, '[data-testid="bookmark"]'):
+        print("✅ 取消收藏成功！")
+        return True
+    else:
+        print("❌ 取消收藏可能失败")
         return False
 
-    tweet_id = extract_tweet_id(url)
-    if not tweet_id:
-        print(f"❌ 无效的推文 URL: {url}")
-        return False
 
-    with sync_playwright() as p:
-        try:
-            browser = p.chromium.connect_over_cdp(CDP_URL)
-        except Exception as e:
-            print(f"❌ 无法连接 CDP ({CDP_URL}): {e}")
-            return False
-
-        context = browser.contexts[0]
-        page = context.new_page()
-
-        try:
-            print(f"📍 导航到推文页面...")
-            page.goto(url, wait_until="domcontentloaded", timeout=60000)
-            time.sleep(2)
-
-            unbookmark_btn = page.locator('[data-testid="removeBookmark"]').first
-            
-            if unbookmark_btn.count() == 0:
-                print("⚠️ 这条推文没有收藏过")
-                return True
-
-            print("🗑️ 取消收藏中...")
-            unbookmark_btn.click()
-            time.sleep(1)
-
-            print("✅ 取消收藏成功！")
-            return True
-
-        except PlaywrightTimeout as e:
-            print(f"❌ 超时: {e}")
-            return False
-        except Exception as e:
-            print(f"❌ 错误: {e}")
-            return False
-        finally:
-            page.close()
+def run_batch(action, urls: list[str]) -> bool:
+    """对多条推文依次执行同一互动命令（共用一个 CDP 连接和页面），全部成功才返回 True"""
+    ok = True
+    for i, url in enumerate(urls, 1):
+        if len(urls) > 1:
+            print(f"[{i}/{len(urls)}] {url}")
+        ok = action(url) and ok
+    return ok
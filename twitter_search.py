@@ -6,7 +6,6 @@ Twitter 搜索功能模块
 - 搜索用户资料
 """
 
-import subprocess
 import sys
 import tempfile
 import time
@@ -15,11 +14,9 @@ from pathlib import Path
 from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
 
 from chrome_utils import CDP_URL, ensure_chrome_cdp
+from ocr_client import run_paddle_ocr
 
 
-# PaddleOCR 脚本路径
-PADDLE_OCR_DIR = Path.home() / "paddle-ocr"
-
 # 常用用户 (Albert 时间线上常见的人)
 KNOWN_USERS = {
     # 格式: "昵称/备注": "username"
@@ -31,30 +28,6 @@ DEFAULT_WIDTH = 1280
 DEFAULT_HEIGHT = 4000
 
 
-def run_paddle_ocr(image_path: str) -> str | None:
-    """调用 PaddleOCR 识别图片"""
-    try:
-        result = subprocess.run(
-            ["uv", "run", "python", "ocr.py", image_path],
-            cwd=PADDLE_OCR_DIR,
-            capture_output=True,
-            text=True,
-            timeout=60,
-            env={
-                **dict(__import__("os").environ),
-                "PADDLE_PDX_DISABLE_MODEL_SOURCE_CHECK": "True"
-            }
-        )
-        if result.returncode == 0:
-            return result.stdout.strip()
-        else:
-            print(f"❌ OCR 失败: {result.stderr}", file=sys.stderr)
-            return None
-    except Exception as e:
-        print(f"❌ OCR 错误: {e}", file=sys.stderr)
-        return None
-
-
 def search_keyword(
     query: str,
     filter_type: str = "top",
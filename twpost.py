@@ -4,104 +4,95 @@
 import argparse
 import sys
 import time
-import re
 from pathlib import Path
 
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
-
-from chrome_utils import CDP_URL, ensure_chrome_cdp
-from twitter_actions import like_tweet, unlike_tweet, bookmark_tweet, unbookmark_tweet
-
-
-def extract_tweet_id(url: str) -> str | None:
-    """Extract tweet ID from URL."""
-    match = re.search(r"/status/(\d+)", url)
-    return match.group(1) if match else None
+from chrome_utils import CDP_URL, acquire_page, ensure_chrome_cdp, release_page
 
 
 def post_tweet(text: str, reply_to: str | None = None, image: str | None = None) -> bool:
     """Post a tweet using Chrome CDP connection."""
+    # Deferred so `twpost --help` doesn't pay for the playwright import
+    from playwright.sync_api import TimeoutError as PlaywrightTimeout
+    from twitter_actions import extract_tweet_id
+
     if not ensure_chrome_cdp():
         return False
 
-    with sync_playwright() as p:
-        try:
-            browser = p.chromium.connect_over_cdp(CDP_URL)
-        except Exception as e:
-            print(f"❌ 无法连接 CDP ({CDP_URL}): {e}")
-            print("请确保 Chrome 已启动并开启了远程调试端口")
-            return False
-
-        context = browser.contexts[0]
-        page = context.new_page()
-
-        try:
-            if reply_to:
-                # 回复模式：先导航到推文页面
-                tweet_id = extract_tweet_id(reply_to)
-                if not tweet_id:
-                    print(f"❌ 无效的推文 URL: {reply_to}")
-                    return False
-
-                print(f"📍 导航到推文页面...")
-                page.goto(reply_to, wait_until="domcontentloaded", timeout=60000)
-                page.wait_for_selector('[data-testid="reply"]', timeout=30000)
-                time.sleep(1)
-
-                # 点击回复按钮
-                print("💬 点击回复...")
-                reply_btn = page.locator('[data-testid="reply"]').first
-                reply_btn.click()
-                time.sleep(1)
-
-            else:
-                # 发新推文：去首页
-                print("📍 导航到 X 首页...")
-                page.goto("https://x.com/home", wait_until="domcontentloaded", timeout=60000)
-                page.wait_for_selector('[data-testid="tweetTextarea_0"]', timeout=30000)
-                time.sleep(1)
-
-            # 找到输入框
-            print("✍️  输入内容...")
-            editor = page.locator('[data-testid="tweetTextarea_0"]').first
-            editor.click()
-            time.sleep(0.5)
-            editor.fill(text)
-            time.sleep(0.5)
-
-            # 上传图片（如果有）
-            if image:
-                image_path = Path(image).expanduser().resolve()
-                if not image_path.exists():
-                    print(f"❌ 图片不存在: {image_path}")
-                    return False
-
-                print(f"🖼️  上传图片: {image_path}")
-                file_input = page.locator('input[type="file"][accept*="image"]').first
-                file_input.set_input_files(str(image_path))
-                time.sleep(2)  # 等待上传
-
-            # 点击发送按钮
-            print("🚀 发送推文...")
-            if reply_to:
-                send_btn = page.locator('[data-testid="tweetButton"]').first
-            else:
-                send_btn = page.locator('[data-testid="tweetButtonInline"]').first
-
-            send_btn.click()
-            time.sleep(3)  # 等待发送完成
-
-            print("✅ 发送成功！")
-            return True
-
-        except PlaywrightTimeout as e:
-            print(f"❌ 超时: {e}")
-            return False
-        except Exception as e:
-            print(f"❌ 错误: {e}")
-            return False
-        finally:
-            page.close()
+    try:
+        page = acquire_page()
+    except Exception as e:
+        print(f"❌ 无法连接 CDP ({CDP_URL}): {e}")
+        print("请确保 Chrome 已启动并开启了远程调试端口")
+        return False
+
+    try:
+        if reply_to:
+            # 回复模式：先导航到推文页面
+            tweet_id = extract_tweet_id(reply_to)
+            if not tweet_id:
+                print(f"❌ 无效的推文 URL: {reply_to}")
+                return False
+
+            print(f"📍 导航到推文页面...")
+            page.goto(reply_to, wait_until="domcontentloaded", timeout=60000)
+            page.wait_for_selector('[data-testid="reply"]', timeout=30000)
+            time.sleep(1)
+
+            # 点击回复按钮
+            print("💬 点击回复...")
+            reply_btn = page.locator('[data-testid="reply"]').first
+            reply_btn.click()
+            time.sleep(1)
+
+        else:
+            # 发新推文：去首页
+            print("📍 导航到 X 首页...")
+            page.goto("https://x.com/home", wait_until="domcontentloaded", timeout=60000)
+            page.wait_for_selector('[data-testid="tweetTextarea_0"]', timeout=30000)
+            time.sleep(1)
+
+        # 找到输入框
+        print("✍️  输入内容...")
+        editor = page.locator('[data-testid="tweetTextarea_0"]').first
+        editor.click()
+        time.sleep(0.5)
+        # 输入框刚点开是空的，直接一条 Input.insertText 写入（fill 还要多做聚焦、全选、删除）
+        page.keyboard.insert_text(text)
+        time.sleep(0.5)
+
+        # 上传图片（如果有）
+        if image:
+            image_path = Path(image).expanduser().resolve()
+            if not image_path.exists():
+                print(f"❌ 图片不存在: {image_path}")
+                return False
+
+            print(f"🖼️  上传图片: {image_path}")
+            file_input = page.locator('input[type="file"][accept*="image"]').first
+            file_input.set_input_files(str(image_path))
+            time.sleep(2)  # 等待上传
+
+        # 点击发送按钮
+        print("🚀 发送推文...")
+        if reply_to:
+            send_btn = page.locator('[data-testid="tweetButton"]').first
+        else:
+            send_btn = page.locator('[data-testid="tweetButtonInline"]').first
+
+        send_btn.click()
+        time.sleep(3)  # 等待发送完成
+
+        print("✅ 发送成功！")
+        return True
+
+    except PlaywrightTimeout as e:
+        print(f"❌ 超时: {e}")
+        return False
+    except Exception as e:
+        print(f"❌ 错误: {e}")
+        return False
+    finally:
+        release_page(page)
 
 
 def main():
@@ -114,16 +105,24 @@ def main():
         if len(sys.argv) < 3:
             print(f"❌ {cmd} 需要 URL 参数")
             sys.exit(1)
-        url = sys.argv[2]
+        urls = sys.argv[2:]
+
+        from twitter_actions import (
+            bookmark_tweet,
+            like_tweet,
+            run_batch,
+            unbookmark_tweet,
+            unlike_tweet,
+        )
         
         if cmd == "like":
-            success = like_tweet(url)
+            success = run_batch(like_tweet, urls)
         elif cmd == "unlike":
-            success = unlike_tweet(url)
+            success = run_batch(unlike_tweet, urls)
         elif cmd == "bookmark":
-            success = bookmark_tweet(url)
+            success = run_batch(bookmark_tweet, urls)
         elif cmd == "unbookmark":
-            success = unbookmark_tweet(url)
+            success = run_batch(unbookmark_tweet, urls)
         sys.exit(0 if success else 1)
     
     # 发推文模式
@@ -136,6 +135,7 @@ def main():
   twpost --reply URL "回复内容"                  # 回复推文
   twpost --image photo.jpg "带图推文"            # 带图片
   twpost like URL                                # 点赞推文
+  twpost like URL1 URL2 ...                      # 批量点赞
   twpost unlike URL                              # 取消点赞
   twpost bookmark URL                            # 收藏推文
   twpost unbookmark URL                          # 取消收藏
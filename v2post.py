@@ -1,102 +1,294 @@
 #!/usr/bin/env python3
 """CLI tool to post topics on V2EX via Chrome CDP."""
 
-import argparse
+import json
+import os
+import re
+import socket
+import struct
+import subprocess
 import sys
-import time
+from pathlib import Path
+from types import SimpleNamespace
 
-from playwright.sync_api import sync_playwright, TimeoutError as PlaywrightTimeout
+# playwright / chrome_utils 只在本进程直接发帖时才导入：交给常驻进程、--help、参数错误都不需要它们
 
-from chrome_utils import CDP_URL, ensure_chrome_cdp
+
+# 常驻进程 (v2postd) 的 unix socket：消息为 4 字节大端长度 + UTF-8 JSON
+DAEMON_SOCKET = Path(os.environ.get("XDG_RUNTIME_DIR") or "/tmp") / f"v2post-{os.getuid()}.sock"
+DAEMON_SCRIPT = Path(__file__).resolve().parent / "v2postd.py"
+DAEMON_REPLY_TIMEOUT = 180  # seconds, covers the slowest page loads of one post
+_LENGTH = struct.Struct(">I")
+
+# 发帖只需要表单 DOM：图片、字体、音视频以及统计/广告脚本直接丢弃
+# （样式保留，Markdown 下拉组件的显示状态依赖它）
+BLOCKED_RESOURCE_TYPES = frozenset({"image", "font", "media"})
+BLOCKED_URL_PARTS = ("google-analytics.com", "googletagmanager.com", "googlesyndication.com")
+
+# 一次 evaluate 完成登录检查、选 Markdown、填标题和内容并点击「创建」，省掉逐个 locator 操作的 CDP 往返；
+# 下拉组件 (selectboxit) 背后是原生 <select id="select_syntax">，直接设值并触发 change 让组件同步显示。
+# 点击放到 setTimeout 里，让 evaluate 先返回，避免跳转销毁执行上下文
+SUBMIT_FORM_JS = """({title, content}) => {
+    if (document.querySelector('input[name="u"]')) return "login";
+    const fire = (el, type) => el.dispatchEvent(new Event(type, {bubbles: true}));
+    const syntax = document.querySelector('#select_syntax');
+    let markdown = false;
+    if (syntax) {
+        syntax.value = "1";
+        fire(syntax, "change");
+        markdown = syntax.value === "1";
+    }
+    for (const [selector, value] of [['#topic_title', title], ['#topic_content', content]]) {
+        const el = document.querySelector(selector);
+        if (!el) return "missing " + selector;
+        el.value = value;
+        fire(el, "input");
+        fire(el, "change");
+    }
+    const submit = Array.from(document.querySelectorAll('button[type="submit"]'))
+        .find(btn => btn.textContent.includes("创建"));
+    if (!submit) return "missing submit";
+    setTimeout(() => submit.click(), 0);
+    return markdown ? "ok" : "no-markdown";
+}"""
+
+# 发布成功后会跳转到主题页 /t/<id>
+TOPIC_URL_RE = re.compile(r"/t/\d+")
+V2EX_HOST = "www.v2ex.com"
+
+
+def send_message(sock: socket.socket, message: dict) -> None:
+    """发送一条长度前缀 JSON 消息"""
+    data = json.dumps(message, ensure_ascii=False).encode()
+    sock.sendall(_LENGTH.pack(len(data)) + data)
+
+
+def _recv_exact(sock: socket.socket, size: int) -> bytes:
+    buf = bytearray()
+    while len(buf) < size:
+        chunk = sock.recv(size - len(buf))
+        if not chunk:
+            raise ConnectionError("连接已关闭")
+        buf += chunk
+    return bytes(buf)
+
+
+def recv_message(sock: socket.socket) -> dict:
+    """接收一条长度前缀 JSON 消息"""
+    (size,) = _LENGTH.unpack(_recv_exact(sock, _LENGTH.size))
+    return json.loads(_recv_exact(sock, size))
+
+
+def block_assets(route) -> None:
+    """拦截发帖用不到的资源请求"""
+    request = route.request
+    if request.resource_type in BLOCKED_RESOURCE_TYPES or any(part in request.url for part in BLOCKED_URL_PARTS):
+        route.abort()
+    else:
+        route.continue_()
+
+
+def post_v2ex_once(page, title: str, content: str, node: str = "share") -> bool:
+    """在给定页面上完成一次发帖（只做页面操作，不负责连接和页面生命周期）"""
+    from playwright.sync_api import TimeoutError as PlaywrightTimeout
+
+    from chrome_utils import route_keeping_cache
+
+    try:
+        # 拦截规则会让 Playwright 关掉 HTTP 缓存，这里重新打开，静态 JS/CSS 走缓存；
+        # 页面归还连接池时会清掉拦截规则
+        route_keeping_cache(page, block_assets)
+
+        # 导航到发帖页面
+        new_topic_url = f"https://{V2EX_HOST}/new/{node}"
+        print(f"导航到 V2EX 发帖页面: {new_topic_url}")
+        # 收到主文档响应就返回；下面等表单解析完才是真正的就绪条件
+        page.goto(new_topic_url, wait_until="commit", timeout=30000)
+        # 已登录时等表单最后的「创建」按钮（标题、内容都在它之前），未登录时等登录表单
+        page.locator(
+            'button[type="submit"]:has-text("创建"), input[name="u"]'
+        ).first.wait_for(state="attached", timeout=15000)
+        # V2EX 在 DOMContentLoaded 里初始化编辑器和 Markdown 下拉组件，之后再填写提交
+        page.wait_for_load_state("domcontentloaded", timeout=15000)
+
+        # 登录检查 + 选择 Markdown + 填写标题和内容 + 发布
+        print("填写并发布主题 (Markdown)...")
+        status = page.evaluate(SUBMIT_FORM_JS, {"title": title, "content": content})
+        if status == "login":
+            print("请先在 Chrome 中登录 V2EX")
+            return False
+        if status == "no-markdown":
+            print("选择 Markdown 失败，按默认格式发布")
+        elif status != "ok":
+            print(f"发帖表单异常: {status}")
+            return False
+
+        # 检查是否成功（URL 应该变成主题页面）
+        try:
+            page.wait_for_url(TOPIC_URL_RE, timeout=15000)
+        except PlaywrightTimeout:
+            print("发布可能失败，请检查页面状态")
+            return False
+        print(f"发布成功！主题链接: {page.url}")
+        return True
+
+    except PlaywrightTimeout as e:
+        print(f"超时: {e}")
+        return False
+    except Exception as e:
+        print(f"错误: {e}")
+        return False
 
 
 def post_v2ex(title: str, content: str, node: str = "share") -> bool:
     """Post a topic on V2EX using Chrome CDP connection."""
-    if not ensure_chrome_cdp():
+    from chrome_utils import CDP_URL, acquire_page, ensure_chrome_cdp
+
+    if not ensure_chrome_cdp(prewarm_hosts=(V2EX_HOST,)):
+        return False
+
+    try:
+        page = acquire_page()
+    except Exception as e:
+        print(f"无法连接 CDP ({CDP_URL}): {e}")
+        print("请确保 Chrome 已启动并开启了远程调试端口")
         return False
 
-    with sync_playwright() as p:
+    # 发完保持页面打开，方便查看结果
+    return post_v2ex_once(page, title, content, node)
+
+
+def load_batch(path: str) -> list[dict]:
+    """读取 NDJSON 批量任务（"-" 表示 stdin），每行 {"title", "content", "node"?}；格式错误直接退出，一条都不发"""
+    try:
+        text = sys.stdin.read() if path == "-" else Path(path).read_text(encoding="utf-8")
+    except OSError as e:
+        print(f"无法读取批量文件: {e}")
+        sys.exit(1)
+
+    jobs = []
+    for lineno, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
         try:
-            browser = p.chromium.connect_over_cdp(CDP_URL)
-        except Exception as e:
-            print(f"无法连接 CDP ({CDP_URL}): {e}")
-            print("请确保 Chrome 已启动并开启了远程调试端口")
-            return False
+            job = json.loads(line)
+        except ValueError as e:
+            print(f"第 {lineno} 行不是合法 JSON: {e}")
+            sys.exit(1)
+        if not isinstance(job, dict):
+            print(f"第 {lineno} 行应为 JSON 对象")
+            sys.exit(1)
+        for key in ("title", "content"):
+            if not isinstance(job.get(key), str) or not job[key].strip():
+                print(f"第 {lineno} 行缺少 {key} 或为空")
+                sys.exit(1)
+        jobs.append({"title": job["title"], "content": job["content"], "node": job.get("node") or "share"})
+    return jobs
+
+
+def post_batch(jobs: list[dict]) -> bool:
+    """依次发布多个主题，全部成功才返回 True
 
-        context = browser.contexts[0]
-        page = context.new_page()
+    有常驻进程时逐条交给它；否则本进程共用一个 CDP 连接和页面依次发，同时拉起常驻进程。
+    不并发：Playwright 同步 API 只能在创建它的线程里使用，而且 V2EX 按账号限制发帖频率。
+    """
+    from chrome_utils import CDP_URL, acquire_page, ensure_chrome_cdp, release_page
 
+    page = None
+    inline = False
+    ok = True
+    try:
+        for i, job in enumerate(jobs, 1):
+            print(f"[{i}/{len(jobs)}] {job['title']}")
+            success = None if inline else post_via_daemon(job["title"], job["content"], job["node"])
+            if success is None:
+                if page is None:
+                    inline = True
+                    start_daemon()
+                    if not ensure_chrome_cdp(prewarm_hosts=(V2EX_HOST,)):
+                        return False
+                    try:
+                        page = acquire_page()
+                    except Exception as e:
+                        print(f"无法连接 CDP ({CDP_URL}): {e}")
+                        return False
+                success = post_v2ex_once(page, job["title"], job["content"], job["node"])
+            ok = success and ok
+    finally:
+        if page is not None:
+            release_page(page)
+    return ok
+
+
+def post_via_daemon(title: str, content: str, node: str) -> bool | None:
+    """交给常驻进程发帖，打印它的输出；常驻进程没有运行时返回 None"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
         try:
-            # 导航到发帖页面
-            new_topic_url = f"https://www.v2ex.com/new/{node}"
-            print(f"导航到 V2EX 发帖页面: {new_topic_url}")
-            page.goto(new_topic_url, wait_until="domcontentloaded", timeout=60000)
-            time.sleep(2)
-
-            # 检查是否需要登录
-            if page.locator('input[name="u"]').count() > 0:
-                print("请先在 Chrome 中登录 V2EX")
-                return False
-
-            # 选择 Markdown 编辑器（selectboxit 下拉组件）
-            print("选择 Markdown 格式...")
-            try:
-                # 点击下拉按钮打开选项
-                dropdown_btn = page.locator('#select_syntaxSelectBoxIt')
-                dropdown_btn.click()
-                time.sleep(0.3)
-                # 选择 Markdown 选项 (data-val="1")
-                markdown_option = page.locator('li[data-val="1"]')
-                markdown_option.click()
-                time.sleep(0.5)
-            except Exception as e:
-                print(f"选择 Markdown 失败: {e}")
-
-            # 填写标题
-            print("填写标题...")
-            title_input = page.locator('#topic_title')
-            title_input.wait_for(timeout=10000)
-            title_input.click()
-            title_input.fill(title)
-            time.sleep(0.5)
-
-            # 填写内容
-            print("填写内容...")
-            content_input = page.locator('#topic_content')
-            content_input.click()
-            content_input.fill(content)
-            time.sleep(0.5)
-
-            # 点击发布按钮
-            print("发布主题...")
-            submit_btn = page.locator('button[type="submit"]:has-text("创建")')
-            submit_btn.click()
-            time.sleep(3)  # 等待发布完成
-
-            # 检查是否成功（URL 应该变成主题页面）
-            current_url = page.url
-            if "/t/" in current_url:
-                print(f"发布成功！主题链接: {current_url}")
-                return True
-            else:
-                print("发布可能失败，请检查页面状态")
-                return False
-
-        except PlaywrightTimeout as e:
-            print(f"超时: {e}")
+            sock.connect(str(DAEMON_SOCKET))
+        except (FileNotFoundError, ConnectionRefusedError):
+            return None
+        try:
+            sock.settimeout(DAEMON_REPLY_TIMEOUT)
+            send_message(sock, {"title": title, "content": content, "node": node})
+            reply = recv_message(sock)
+        except (OSError, ValueError) as e:
+            # 请求可能已经发出，不再本地重试，避免重复发帖
+            print(f"常驻进程无响应: {e}")
             return False
-        except Exception as e:
-            print(f"错误: {e}")
+    print(reply.get("log", ""), end="")
+    return reply.get("ok", False)
+
+
+def stop_daemon() -> bool:
+    """让常驻进程退出；没有在运行时返回 False"""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.connect(str(DAEMON_SOCKET))
+            sock.settimeout(DAEMON_REPLY_TIMEOUT)
+            send_message(sock, {"stop": True})
+            recv_message(sock)
+        except (OSError, ValueError):
             return False
-        finally:
-            pass  # 保持页面打开
+    return True
 
 
-def main():
-    parser = argparse.ArgumentParser(
-        description="V2EX 发帖 CLI 工具",
-        formatter_class=argparse.RawDescriptionHelpFormatter,
-        epilog="""
+def stop_all() -> None:
+    """--stop：停掉常驻进程和 bot 用的 Chrome（平时两者都常驻，以复用连接、登录态和磁盘缓存）"""
+    from chrome_utils import find_chrome_pids, stop_chrome
+
+    print("常驻进程已停止" if stop_daemon() else "常驻进程未运行")
+    if find_chrome_pids():
+        stop_chrome()
+        print("Chrome 已停止")
+    else:
+        print("Chrome 未运行")
+
+
+def start_daemon() -> None:
+    """后台启动常驻进程（脱离当前会话），供下次调用使用"""
+    subprocess.Popen(
+        [sys.executable, str(DAEMON_SCRIPT)],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+USAGE = """用法: v2post -t 标题 -c 内容 [-n 节点]
+      v2post --batch 任务文件.ndjson
+      v2post --stop
+
+V2EX 发帖 CLI 工具
+
+选项:
+  -t, --title TITLE      主题标题
+  -c, --content CONTENT  主题内容
+  -n, --node NODE        节点名称 (默认: share)
+  --batch FILE           从 NDJSON 文件依次发布多个主题（每行 {"title", "content", "node"}，"-" 为 stdin）
+  --stop                 停止常驻进程和 Chrome（默认发帖后两者都保持运行）
+  -h, --help             显示帮助
+
 示例:
   v2post -t "标题" -c "内容"                    # 发到默认节点 (share)
   v2post -t "标题" -c "内容" -n python          # 发到 python 节点
@@ -110,13 +302,63 @@ def main():
   qna         - 问与答
   apple       - Apple
   create      - 分享创造
-        """,
-    )
-    parser.add_argument("-t", "--title", required=True, help="主题标题")
-    parser.add_argument("-c", "--content", required=True, help="主题内容")
-    parser.add_argument("-n", "--node", default="share", help="节点名称 (默认: share)")
+"""
+
+OPTION_NAMES = {
+    "-t": "title", "--title": "title",
+    "-c": "content", "--content": "content",
+    "-n": "node", "--node": "node",
+    "--batch": "batch",
+}
+
+
+def usage_error(message: str):
+    """打印错误和用法后退出（退出码 2，与原来的 argparse 一致）"""
+    print(USAGE, file=sys.stderr)
+    print(f"v2post: 错误: {message}", file=sys.stderr)
+    sys.exit(2)
+
+
+def parse_args(argv: list[str]) -> SimpleNamespace:
+    """解析 -t/-c/-n/--batch（支持 --title=xxx 写法）；比 argparse 启动快，CLI 只有这几个选项"""
+    values = {"title": None, "content": None, "node": "share", "batch": None, "stop": False}
+    i = 0
+    while i < len(argv):
+        arg = argv[i]
+        if arg in ("-h", "--help"):
+            print(USAGE, end="")
+            sys.exit(0)
+        if arg == "--stop":
+            values["stop"] = True
+            i += 1
+            continue
+        name, has_value, value = arg.partition("=") if arg.startswith("--") else (arg, "", "")
+        if name not in OPTION_NAMES:
+            usage_error(f"无法识别的参数: {arg}")
+        if not has_value:
+            i += 1
+            if i >= len(argv):
+                usage_error(f"{arg} 需要一个参数")
+            value = argv[i]
+        values[OPTION_NAMES[name]] = value
+        i += 1
+
+    missing = [f"-{key[0]}/--{key}" for key in ("title", "content") if values[key] is None]
+    if missing and not values["stop"] and values["batch"] is None:
+        usage_error(f"缺少必需参数: {', '.join(missing)}")
+    return SimpleNamespace(**values)
+
+
+def main():
+    args = parse_args(sys.argv[1:])
+
+    if args.stop:
+        stop_all()
+        return
 
-    args = parser.parse_args()
+    if args.batch is not None:
+        jobs = load_batch(args.batch)
+        sys.exit(0 if post_batch(jobs) else 1)
 
     if not args.title.strip():
         print("标题不能为空")
@@ -126,7 +368,11 @@ def main():
         print("内容不能为空")
         sys.exit(1)
 
-    success = post_v2ex(args.title, args.content, node=args.node)
+    # 优先交给常驻进程；没有运行时本次直接发，同时在后台拉起常驻进程
+    success = post_via_daemon(args.title, args.content, args.node)
+    if success is None:
+        start_daemon()
+        success = post_v2ex(args.title, args.content, node=args.node)
     sys.exit(0 if success else 1)
 
 
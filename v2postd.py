@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+v2post 常驻进程
+- 保持一个 Playwright 驱动和 CDP 连接，后续发帖直接复用，省掉每次的启动开销
+- 监听 v2post.DAEMON_SOCKET，一次处理一个发帖请求，并把日志回传给客户端
+- 空闲超过 DAEMON_IDLE_TIMEOUT 或收到 v2post --stop 时退出
+
+一般由 v2post 在常驻进程未运行时自动拉起，也可以手动运行
+"""
+
+import contextlib
+import fcntl
+import io
+import os
+import socket
+import sys
+
+from chrome_utils import CDP_URL, acquire_page, ensure_chrome_cdp, release_page
+from v2post import DAEMON_SOCKET, V2EX_HOST, post_v2ex_once, recv_message, send_message
+
+
+DAEMON_LOCK = DAEMON_SOCKET.with_name(DAEMON_SOCKET.name + ".lock")
+DAEMON_IDLE_TIMEOUT = 30 * 60  # seconds
+REQUEST_READ_TIMEOUT = 10  # seconds to receive a job after accepting
+
+
+def run_job(job: dict) -> bool:
+    """执行一次发帖"""
+    if not ensure_chrome_cdp(prewarm_hosts=(V2EX_HOST,)):
+        return False
+
+    try:
+        page = acquire_page()
+    except Exception as e:
+        print(f"无法连接 CDP ({CDP_URL}): {e}")
+        return False
+
+    try:
+        return post_v2ex_once(page, job["title"], job["content"], job.get("node", "share"))
+    finally:
+        release_page(page)
+
+
+def handle_connection(conn: socket.socket) -> bool:
+    """读一个请求，执行，回写结果和日志；收到停止请求（v2post --stop）时返回 False"""
+    conn.settimeout(REQUEST_READ_TIMEOUT)
+    job = recv_message(conn)
+    conn.settimeout(None)
+
+    if job.get("stop"):
+        send_message(conn, {"ok": True, "log": ""})
+        return False
+
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        try:
+            ok = run_job(job)
+        except Exception as e:
+            print(f"错误: {e}")
+            ok = False
+    send_message(conn, {"ok": ok, "log": log.getvalue()})
+    return True
+
+
+def main():
+    # 整个生命周期持有锁：两次 v2post 几乎同时拉起常驻进程时只有一个能继续，
+    # 另一个不会去删掉（或在退出时删掉）正在使用的 socket
+    lock_file = open(DAEMON_LOCK, "w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        print(f"v2postd 已在运行: {DAEMON_SOCKET}", file=sys.stderr)
+        lock_file.close()
+        return
+
+    # 持有锁时留下的 socket 只可能来自异常退出的旧进程
+    DAEMON_SOCKET.unlink(missing_ok=True)
+    with lock_file, socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+        server.bind(str(DAEMON_SOCKET))
+        os.chmod(DAEMON_SOCKET, 0o600)
+        server.listen()
+        server.settimeout(DAEMON_IDLE_TIMEOUT)
+        try:
+            while True:
+                try:
+                    conn, _ = server.accept()
+                except TimeoutError:
+                    break
+                with conn:
+                    try:
+                        if not handle_connection(conn):
+                            break
+                    except ConnectionError:
+                        # 客户端提前断开（如请求还没发完就超时退出）
+                        pass
+                    except (OSError, ValueError, KeyError) as e:
+                        print(f"请求处理失败: {e}", file=sys.stderr)
+        finally:
+            DAEMON_SOCKET.unlink(missing_ok=True)
+
+
+if __name__ == "__main__":
+    main()